@@ -1,8 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional
 import asyncio
-from app.schemas.brand import BrandRequest, BrandResponse, BrandInsights
+import importlib.util
+import time
+from app.schemas.brand import BrandRequest, BrandResponse, BrandInsights, CatalogAnalyticsResponse, CollectionInfo, ProductInfo, WatchRequest, RefreshScheduleInfo
 from app.services.shopify_scraper import ShopifyScraper
+from app.services.brand_service import BrandService
+from app.services.extractor_registry import apply_section, extractors, section_value
+from app.services.catalog_export import EXPORT_FORMATS, TABLE_COLUMNS, iter_db_catalogs, iter_live_catalogs, normalize_url, stream_export
+from app.services.database import get_db
+from app.services.refresh_scheduler import RefreshScheduler
+from app.services.resilience import Deadline, circuit_breakers
+from app.services.shared_state import SharedState, coordinated_scrape, scrape_lease
+from app.api.deps import get_scraper, get_shared_state
+from app.core.config import settings
+from app.core.metrics import transfer_metrics
+from app.core.json_codec import FastJSONResponse, dumps
+from app.models.brand import RefreshSchedule
 import logging
 
 # Set up logging
@@ -12,7 +28,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/fetch-insights", response_model=BrandResponse)
-async def fetch_brand_insights(request: BrandRequest) -> BrandResponse:
+async def fetch_brand_insights(
+    request: BrandRequest,
+    db: Session = Depends(get_db),
+    scraper: ShopifyScraper = Depends(get_scraper),
+    shared_state: SharedState = Depends(get_shared_state)
+) -> FastJSONResponse:
     """
     Fetch brand insights from a Shopify store URL
     
@@ -23,49 +44,140 @@ async def fetch_brand_insights(request: BrandRequest) -> BrandResponse:
         BrandResponse with scraped insights or error information
     """
     try:
-        website_url = str(request.website_url)
+        website_url = normalize_url(str(request.website_url))
         logger.info(f"Starting to scrape insights for: {website_url}")
         
-        # Initialize scraper
-        scraper = ShopifyScraper()
+        # The request's deadline is propagated down to every stage and fetch
+        deadline = Deadline(min(request.deadline_seconds or settings.SCRAPE_DEADLINE, settings.MAX_SCRAPE_DEADLINE))
         
-        # Scrape brand insights
-        insights = await scraper.scrape_brand_insights(website_url)
+        # Scrape brand insights, or wait for the worker already scraping this store
+        insights, scraped = await coordinated_scrape(
+            shared_state, website_url, deadline, lambda: scraper.scrape_brand_insights(website_url, deadline)
+        )
+        
+        logger.info(f"Successfully {'scraped' if scraped else 'loaded cached'} insights for: {website_url}")
         
-        logger.info(f"Successfully scraped insights for: {website_url}")
+        # Persist the results so exports can be served from the database
+        if scraped:
+            try:
+                BrandService.save_insights(db, insights)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not persist insights for {website_url}: {str(e)}")
         
-        return BrandResponse(
+        # Encoded straight from the model; large catalogs skip FastAPI's response_model round trip
+        return FastJSONResponse(BrandResponse(
             success=True,
             data=insights,
             status_code=200
-        )
+        ))
         
     except Exception as e:
         error_message = str(e)
         logger.error(f"Error scraping {website_url}: {error_message}")
         
-        # Determine appropriate status code
-        status_code = 500
-        if "not found" in error_message.lower() or "404" in error_message:
-            status_code = 404
-        elif "timeout" in error_message.lower():
-            status_code = 408
-        elif "connection" in error_message.lower():
-            status_code = 503
-            
-        return BrandResponse(
+        return FastJSONResponse(BrandResponse(
             success=False,
             error=error_message,
-            status_code=status_code
-        )
+            status_code=_error_status_code(error_message)
+        ))
+
+def _error_status_code(error_message: str) -> int:
+    """Map a scrape failure to the status code reported to clients"""
+    status_code = 500
+    if "not found" in error_message.lower() or "404" in error_message:
+        status_code = 404
+    elif "not a shopify store" in error_message.lower():
+        status_code = 422
+    elif "timeout" in error_message.lower():
+        status_code = 408
+    elif "connection" in error_message.lower():
+        status_code = 503
+    return status_code
+
+def _sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+@router.post("/fetch-insights/stream")
+async def stream_brand_insights(
+    request: BrandRequest,
+    db: Session = Depends(get_db),
+    scraper: ShopifyScraper = Depends(get_scraper),
+    shared_state: SharedState = Depends(get_shared_state)
+) -> StreamingResponse:
+    """
+    Fetch brand insights as Server-Sent Events, one `section` event per stage as it completes
+    
+    Args:
+        request: BrandRequest containing website_url
+        
+    Returns:
+        text/event-stream of `section` events ({"section", "data"}; a later event for the same
+        section replaces the earlier one), then a `summary` event, or an `error` event on failure
+    """
+    website_url = normalize_url(str(request.website_url))
+    deadline = Deadline(min(request.deadline_seconds or settings.SCRAPE_DEADLINE, settings.MAX_SCRAPE_DEADLINE))
+    
+    async def events():
+        started = time.monotonic()
+        sections = []
+        try:
+            async with scrape_lease(shared_state, website_url, deadline) as lease:
+                if lease.cached is not None:
+                    insights, scraped = lease.cached, False
+                    # Every registered section, plugin ones included, as a live scrape would emit them
+                    for section in ["store_fingerprint"] + extractors.sections:
+                        sections.append(section)
+                        yield _sse("section", {"section": section, "data": section_value(insights, section)})
+                else:
+                    insights, scraped = BrandInsights(website_url=website_url), True
+                    async for section, value in scraper.iter_brand_insights(website_url, deadline):
+                        apply_section(insights, section, value)
+                        sections.append(section)
+                        yield _sse("section", {"section": section, "data": value})
+                    insights.scraping_status = scraper.scraping_status(website_url)
+                    await lease.store(insights)
+                    
+            if scraped:
+                try:
+                    BrandService.save_insights(db, insights)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Could not persist insights for {website_url}: {str(e)}")
+                    
+            yield _sse("summary", {
+                "success": True,
+                "website_url": website_url,
+                "scraping_status": insights.scraping_status,
+                "cached": not scraped,
+                "sections": list(dict.fromkeys(sections)),
+                "elapsed_seconds": round(time.monotonic() - started, 3)
+            })
+            
+        except Exception as e:
+            error_message = str(e)
+            logger.error(f"Error streaming {website_url}: {error_message}")
+            yield _sse("error", {"success": False, "error": error_message, "status_code": _error_status_code(error_message)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint for the Shopify scraper service"""
-    return {"status": "healthy", "service": "shopify-scraper"}
+    return {"status": "healthy", "service": "shopify-scraper", "circuits": circuit_breakers.snapshot()}
+
+@router.get("/metrics")
+async def transfer_metrics_snapshot():
+    """Bytes fetched per host on the wire and after decoding, plus bodies rejected by the size limits"""
+    return transfer_metrics.snapshot()
 
 @router.get("/test-scraper/{test_url:path}")
-async def test_scraper(test_url: str) -> Dict[str, Any]:
+async def test_scraper(test_url: str, scraper: ShopifyScraper = Depends(get_scraper)) -> Dict[str, Any]:
     """
     Test endpoint to quickly check if a URL is scrapable
     
@@ -78,19 +190,19 @@ async def test_scraper(test_url: str) -> Dict[str, Any]:
     try:
         if not test_url.startswith(('http://', 'https://')):
             test_url = 'https://' + test_url
-            
-        scraper = ShopifyScraper()
         
-        # Quick test - just try to get basic info
-        brand_name = await scraper._get_brand_name(test_url)
-        product_catalog = await scraper._get_product_catalog(test_url)
+        # Quick test - a single homepage request answers both questions
+        fingerprint = await scraper._detect_store(test_url)
+        brand_name = None
+        if fingerprint.is_shopify:
+            brand_name = (await scraper.extract_sections(test_url, ['brand_name']))['brand_name']
         
         return {
             "url": test_url,
             "accessible": True,
+            "is_shopify": fingerprint.is_shopify,
             "brand_name": brand_name,
-            "has_products_json": product_catalog is not None,
-            "product_count": len(product_catalog) if product_catalog else 0
+            "fingerprint": fingerprint.dict()
         }
         
     except Exception as e:
@@ -98,4 +210,167 @@ async def test_scraper(test_url: str) -> Dict[str, Any]:
             "url": test_url,
             "accessible": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+@router.get("/export")
+async def export_catalog(
+    website_url: Optional[List[str]] = Query(None),
+    format: str = "csv",
+    table: str = "products",
+    source: str = "db",
+    db: Session = Depends(get_db),
+    scraper: ShopifyScraper = Depends(get_scraper)
+):
+    """
+    Export product or variant catalogs as CSV, Parquet or Arrow
+    
+    Args:
+        website_url: Stores to export (repeatable); all stored catalogs when omitted
+        format: csv, parquet or arrow
+        table: products or variants
+        source: db to read stored catalogs, live to stream straight from the crawler
+        
+    Returns:
+        Streaming response with the encoded catalog
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if table not in TABLE_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unsupported table: {table}")
+    if format != "csv" and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=501, detail="pyarrow is required for parquet and arrow exports")
+        
+    if source == "live":
+        if not website_url:
+            raise HTTPException(status_code=400, detail="website_url is required for live exports")
+        catalogs = iter_live_catalogs(scraper, website_url)
+    elif source == "db":
+        catalogs = iter_db_catalogs(db, website_url)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported source: {source}")
+        
+    media_type, extension = EXPORT_FORMATS[format]
+    
+    return StreamingResponse(
+        stream_export(catalogs, format, table),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    )
+
+@router.get("/analytics", response_model=CatalogAnalyticsResponse)
+def catalog_analytics(
+    website_url: Optional[List[str]] = Query(None),
+    top: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+) -> CatalogAnalyticsResponse:
+    """
+    Price distribution, discount depth, stock-out ratios and vendor/product type
+    breakdowns computed over stored catalogs
+    
+    Args:
+        website_url: Stores to analyze (repeatable); every stored catalog when omitted
+        top: Number of vendors/product types to include in the breakdowns
+        
+    Returns:
+        Per-store analytics, plus cohort-wide analytics when several stores match
+    """
+    # A plain def: FastAPI runs it in the threadpool, so the pandas work doesn't block the event loop
+    try:
+        # pandas is only loaded by the first analytics request, and is absent from slim installs
+        from app.services.catalog_analytics import CatalogAnalyticsService
+    except ImportError:
+        raise HTTPException(status_code=501, detail="pandas is required for catalog analytics")
+        
+    if website_url:
+        website_url = [normalize_url(url) for url in website_url]
+
+    analytics = CatalogAnalyticsService.get_analytics(db, website_url, top)
+    
+    if analytics is None:
+        raise HTTPException(status_code=404, detail="No stored catalog found for the requested stores")
+        
+    return analytics
+
+@router.get("/insights", response_model=BrandInsights)
+async def stored_insights(website_url: str, db: Session = Depends(get_db)) -> FastJSONResponse:
+    """
+    Insights stored by the last scrape or refresh of a store, without scraping it again
+    
+    Args:
+        website_url: Store URL as passed to fetch-insights
+        
+    Returns:
+        BrandInsights including the policy and about texts
+    """
+    # The service canonicalizes the URL the way fetch-insights stored it
+    insights = BrandService.get_insights(db, website_url)
+    
+    if insights is None:
+        raise HTTPException(status_code=404, detail="No stored insights for this store")
+        
+    return FastJSONResponse(insights)
+
+@router.get("/collections", response_model=List[CollectionInfo])
+async def list_collections(website_url: str, db: Session = Depends(get_db)) -> List[CollectionInfo]:
+    """
+    List the stored collections of a scraped store
+    
+    Args:
+        website_url: Store URL as passed to fetch-insights
+        
+    Returns:
+        Collections with the ids of the products they contain
+    """
+    db_brand = BrandService.get_brand_by_url(db, website_url)
+    
+    if not db_brand or not db_brand.collections:
+        raise HTTPException(status_code=404, detail="No stored collections for this store")
+        
+    return db_brand.collections
+
+@router.get("/collections/{handle}/products", response_model=List[ProductInfo])
+async def collection_products(handle: str, website_url: str, db: Session = Depends(get_db)) -> List[ProductInfo]:
+    """
+    Products in a stored collection, resolved from the stored catalog
+    
+    Args:
+        handle: Collection handle, e.g. "sale"
+        website_url: Store URL as passed to fetch-insights
+        
+    Returns:
+        Products of the collection
+    """
+    products = BrandService.get_collection_products(db, website_url, handle)
+    
+    if products is None:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {handle}")
+        
+    return products
+
+@router.post("/watch", response_model=List[RefreshScheduleInfo])
+async def watch_store(request: WatchRequest, db: Session = Depends(get_db)) -> List[RefreshScheduleInfo]:
+    """
+    Add a store to the refresh scheduler
+    
+    Args:
+        request: WatchRequest containing website_url
+        
+    Returns:
+        The catalog and content schedules of the store
+    """
+    return RefreshScheduler.watch(db, normalize_url(str(request.website_url)))
+
+@router.delete("/watch")
+async def unwatch_store(website_url: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Stop refreshing a store"""
+    if not RefreshScheduler.unwatch(db, normalize_url(website_url)):
+        raise HTTPException(status_code=404, detail="Store is not watched")
+    return {"website_url": normalize_url(website_url), "watched": False}
+
+@router.get("/schedule", response_model=List[RefreshScheduleInfo])
+async def refresh_schedule(website_url: Optional[str] = None, db: Session = Depends(get_db)) -> List[RefreshScheduleInfo]:
+    """Current refresh schedule of every watched store (or only `website_url`), soonest first"""
+    query = db.query(RefreshSchedule).filter(RefreshSchedule.is_active.is_(True))
+    if website_url:
+        query = query.filter(RefreshSchedule.website_url == normalize_url(website_url))
+    return query.order_by(RefreshSchedule.next_run_at).all()
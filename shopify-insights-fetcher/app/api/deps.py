@@ -0,0 +1,15 @@
+from fastapi import Request
+from app.services.shared_state import SharedState
+from app.services.shopify_scraper import ShopifyScraper
+
+
+def get_scraper(request: Request) -> ShopifyScraper:
+    """Scraper for one request, backed by the app's shared HTTP session, thread pool, probe cache and archive"""
+    state = request.app.state
+    return ShopifyScraper(session=state.http_session, executor=state.executor,
+                          probe_cache=state.probe_cache, archive=state.page_archive)
+
+
+def get_shared_state(request: Request) -> SharedState:
+    """Result cache and scrape leases shared with the other workers"""
+    return request.app.state.shared_state
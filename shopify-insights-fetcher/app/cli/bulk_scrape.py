@@ -0,0 +1,291 @@
+"""
+Scrape many stores directly with the async engine, without going through the API.
+
+Usage:
+    python -m app.cli.bulk_scrape --file stores.txt --output db
+    python -m app.cli.bulk_scrape --file - --output ndjson --path insights.ndjson < stores.txt
+    python -m app.cli.bulk_scrape --file stores.txt --output parquet --path insights/ --concurrency 32
+
+Completed stores are appended to a checkpoint file, so an interrupted run started again with the
+same arguments continues where it stopped. With --archive DIR every raw response is kept as well,
+so extraction can later be re-run offline with app.cli.replay_archive.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Dict
+from app.cli.common import read_urls
+from app.core.config import settings
+from app.schemas.brand import BrandInsights
+from app.core.urls import normalize_url
+from app.services.resilience import Deadline
+
+PARQUET_COLUMNS = (
+    ('website_url', 'string'),
+    ('brand_name', 'string'),
+    ('scraping_status', 'string'),
+    ('product_count', 'int64'),
+    ('scraped_at', 'string'),
+    ('insights', 'string'),
+)
+
+
+class Checkpoint:
+    """Append-only log of finished stores; each line is `<status>\\t<url>`"""
+
+    def __init__(self, path: str, retry_failed: bool = False):
+        self.path = path
+        self.finished: Dict[str, str] = {}
+
+        if os.path.exists(path):
+            with open(path) as handle:
+                for line in handle:
+                    status, _, url = line.rstrip('\n').partition('\t')
+                    if url:
+                        self.finished[normalize_url(url)] = status
+
+        if retry_failed:
+            self.finished = {url: status for url, status in self.finished.items() if status == 'ok'}
+
+        self._handle = open(path, 'a')
+
+    def record(self, urls: List[str], status: str) -> None:
+        for url in urls:
+            self._handle.write(f"{status}\t{url}\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class ResultWriter:
+    """Persists scrape results, stamping `scraped_at`; `write` returns the URLs that are now durable"""
+
+    def write(self, insights: BrandInsights) -> List[str]:
+        raise NotImplementedError
+
+    def close(self) -> List[str]:
+        return []
+
+
+class DatabaseWriter(ResultWriter):
+    def __init__(self):
+        from app.services.brand_service import BrandService
+        from app.services.database import SessionLocal, create_tables
+        create_tables()
+        self._service = BrandService
+        self.db = SessionLocal()
+
+    def write(self, insights: BrandInsights) -> List[str]:
+        try:
+            self._service.save_insights(self.db, insights)
+        except Exception:
+            self.db.rollback()
+            raise
+        return [insights.website_url]
+
+    def close(self) -> List[str]:
+        self.db.close()
+        return []
+
+
+class NDJSONWriter(ResultWriter):
+    def __init__(self, path: str):
+        # Appending keeps the records of earlier, interrupted runs
+        self._handle = open(path, 'a')
+
+    def write(self, insights: BrandInsights) -> List[str]:
+        insights.scraped_at = insights.scraped_at or datetime.utcnow()
+        self._handle.write(insights.json() + '\n')
+        self._handle.flush()
+        return [insights.website_url]
+
+    def close(self) -> List[str]:
+        self._handle.close()
+        return []
+
+
+class ParquetWriter(ResultWriter):
+    """Writes batches of stores as numbered part files in a directory"""
+
+    def __init__(self, path: str, batch_size: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("pyarrow is required for parquet output")
+
+        self._pa = pa
+        self._pq = pq
+        self.schema = pa.schema([(name, getattr(pa, logical_type)()) for name, logical_type in PARQUET_COLUMNS])
+        self.path = path
+        self.batch_size = batch_size
+        self._rows: List[Dict[str, object]] = []
+        os.makedirs(path, exist_ok=True)
+        self._part = len([name for name in os.listdir(path) if name.endswith('.parquet')])
+
+    def write(self, insights: BrandInsights) -> List[str]:
+        insights.scraped_at = insights.scraped_at or datetime.utcnow()
+        self._rows.append({
+            'website_url': insights.website_url,
+            'brand_name': insights.brand_name,
+            'scraping_status': insights.scraping_status,
+            'product_count': len(insights.product_catalog or []),
+            'scraped_at': insights.scraped_at.isoformat() if insights.scraped_at else None,
+            'insights': insights.json(),
+        })
+        if len(self._rows) >= self.batch_size:
+            return self._flush()
+        return []
+
+    def _flush(self) -> List[str]:
+        if not self._rows:
+            return []
+
+        table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+        target = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+        # Write then rename so a crash never leaves a truncated part behind
+        self._pq.write_table(table, target + '.tmp')
+        os.replace(target + '.tmp', target)
+        self._part += 1
+
+        urls = [row['website_url'] for row in self._rows]
+        self._rows = []
+        return urls
+
+    def close(self) -> List[str]:
+        return self._flush()
+
+
+def _open_writer(args: argparse.Namespace) -> ResultWriter:
+    if args.output == 'db':
+        return DatabaseWriter()
+    if args.output == 'ndjson':
+        return NDJSONWriter(args.path or 'insights.ndjson')
+    return ParquetWriter(args.path or 'insights_parquet', args.batch_size)
+
+
+class Stats:
+    """Running counters for throughput reporting"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.ok = 0
+        self.failed = 0
+        self.products = 0
+        self.started = time.monotonic()
+
+    @property
+    def done(self) -> int:
+        return self.ok + self.failed
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"{self.done}/{self.total} stores ({self.ok} ok, {self.failed} failed) in {elapsed:.1f}s - "
+            f"{self.done / elapsed:.2f} stores/s, {self.products / elapsed:.1f} products/s"
+        )
+
+
+async def _report(stats: Stats, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        print(stats.line(), file=sys.stderr)
+
+
+async def _worker(queue: asyncio.Queue, args: argparse.Namespace, writer: ResultWriter,
+                  checkpoint: Checkpoint, stats: Stats, archive=None) -> None:
+    from app.services.shopify_scraper import ShopifyScraper
+
+    # One scraper per worker: a scraper keeps per-scrape state and scrapes one store at a time.
+    # Probe outcomes are persisted only when results go to the database anyway
+    probe_cache = None
+    if args.output == 'db' and settings.PROBE_CACHE_ENABLED:
+        from app.services.probe_cache import ProbeCache
+        probe_cache = ProbeCache()
+    scraper = ShopifyScraper(probe_cache=probe_cache, archive=archive)
+
+    while True:
+        url = await queue.get()
+        try:
+            insights = await scraper.scrape_brand_insights(url, Deadline(args.deadline))
+            checkpoint.record(writer.write(insights), 'ok')
+            stats.ok += 1
+            stats.products += len(insights.product_catalog or [])
+        except Exception as e:
+            stats.failed += 1
+            checkpoint.record([url], 'failed')
+            print(f"{url}: {str(e)}", file=sys.stderr)
+        finally:
+            queue.task_done()
+
+
+async def _bulk_scrape(args: argparse.Namespace) -> int:
+    urls = read_urls(args.urls, args.file)
+    if not urls:
+        print("No store URLs given", file=sys.stderr)
+        return 2
+
+    checkpoint = Checkpoint(args.checkpoint, args.retry_failed)
+    pending = [url for url in urls if url not in checkpoint.finished]
+    if len(pending) < len(urls):
+        print(f"Resuming: {len(urls) - len(pending)} of {len(urls)} stores already done", file=sys.stderr)
+
+    writer = _open_writer(args)
+    archive = None
+    if args.archive:
+        from app.services.page_archive import PageArchive
+        archive = PageArchive(args.archive)
+    stats = Stats(len(pending))
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in pending:
+        queue.put_nowait(url)
+
+    workers = [
+        asyncio.create_task(_worker(queue, args, writer, checkpoint, stats, archive))
+        for _ in range(min(args.concurrency, len(pending)))
+    ]
+    reporter = asyncio.create_task(_report(stats, args.progress_interval))
+
+    try:
+        await queue.join()
+    finally:
+        for task in workers + [reporter]:
+            task.cancel()
+        await asyncio.gather(*workers, reporter, return_exceptions=True)
+        # Results still buffered by the writer only count as done once flushed
+        checkpoint.record(writer.close(), 'ok')
+        checkpoint.close()
+
+    print(stats.line(), file=sys.stderr)
+    return 0 if stats.failed == 0 else 1
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scrape Shopify stores in bulk into the database, NDJSON or Parquet")
+    parser.add_argument('urls', nargs='*', help="Store URLs")
+    parser.add_argument('--file', help="File with one store URL per line, '-' for stdin")
+    parser.add_argument('--output', choices=['db', 'ndjson', 'parquet'], default='db')
+    parser.add_argument('--path', help="NDJSON file or Parquet directory (defaults: insights.ndjson, insights_parquet/)")
+    parser.add_argument('--concurrency', type=int, default=settings.BULK_CONCURRENCY, help="Stores scraped at once")
+    parser.add_argument('--deadline', type=float, default=settings.SCRAPE_DEADLINE, help="Seconds allowed per store")
+    parser.add_argument('--checkpoint', default='bulk_scrape.checkpoint', help="Checkpoint file used to resume")
+    parser.add_argument('--retry-failed', action='store_true', help="Scrape stores that failed in earlier runs again")
+    parser.add_argument('--batch-size', type=int, default=settings.BULK_PARQUET_BATCH_SIZE, help="Stores per Parquet part file")
+    parser.add_argument('--progress-interval', type=float, default=10, help="Seconds between progress lines")
+    parser.add_argument('--archive', help="Also archive raw responses into this directory (see app.cli.replay_archive)")
+    args = parser.parse_args(argv)
+
+    try:
+        return asyncio.run(_bulk_scrape(args))
+    except KeyboardInterrupt:
+        print("Interrupted; run again with the same arguments to resume", file=sys.stderr)
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+Helpers shared by the command-line tools.
+"""
+import sys
+from typing import Iterable, List, Optional
+from app.core.urls import normalize_url
+
+
+def read_urls(urls: Iterable[str], file: Optional[str] = None) -> List[str]:
+    """Collect store URLs from the command line and a file ('-' for stdin), canonical and without duplicates"""
+    urls = list(urls)
+
+    if file == '-':
+        urls.extend(line.strip() for line in sys.stdin)
+    elif file:
+        with open(file) as handle:
+            urls.extend(line.strip() for line in handle)
+
+    return list(dict.fromkeys(normalize_url(url) for url in urls if url and not url.startswith('#')))
@@ -0,0 +1,64 @@
+"""
+Export scraped product catalogs for analytics.
+
+Usage:
+    python -m app.cli.export_catalog --format parquet --output products.parquet https://memy.co.in
+    python -m app.cli.export_catalog --source live --table variants --format csv --file - < stores.txt
+"""
+import argparse
+import asyncio
+import sys
+from typing import List
+from app.cli.common import read_urls
+from app.services.catalog_export import EXPORT_FORMATS, TABLE_COLUMNS, iter_db_catalogs, iter_live_catalogs, stream_export
+
+
+async def _export(args: argparse.Namespace) -> int:
+    urls = read_urls(args.urls, args.file)
+
+    if args.source == 'live':
+        if not urls:
+            print("At least one store URL is required for live exports", file=sys.stderr)
+            return 2
+        from app.services.shopify_scraper import ShopifyScraper
+        catalogs = iter_live_catalogs(ShopifyScraper(), urls)
+        db = None
+    else:
+        from app.services.database import SessionLocal, create_tables
+        create_tables()
+        db = SessionLocal()
+        catalogs = iter_db_catalogs(db, urls or None)
+
+    output = open(args.output, 'wb') if args.output != '-' else sys.stdout.buffer
+    written = 0
+
+    try:
+        async for data in stream_export(catalogs, args.format, args.table, args.chunk_size):
+            output.write(data)
+            written += len(data)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        if db is not None:
+            db.close()
+
+    print(f"Wrote {written} bytes of {args.table} as {args.format}", file=sys.stderr)
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export scraped Shopify catalogs as CSV, Parquet or Arrow")
+    parser.add_argument('urls', nargs='*', help="Store URLs (defaults to every stored catalog for --source db)")
+    parser.add_argument('--file', help="File with one store URL per line, '-' for stdin")
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='parquet')
+    parser.add_argument('--table', choices=sorted(TABLE_COLUMNS), default='products')
+    parser.add_argument('--source', choices=['db', 'live'], default='db')
+    parser.add_argument('--output', default='-', help="Output path, '-' for stdout")
+    parser.add_argument('--chunk-size', type=int, default=None, help="Rows per written chunk / row group")
+    args = parser.parse_args(argv)
+
+    return asyncio.run(_export(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Re-run every extractor against a page archive, with no network access.
+
+Usage:
+    python -m app.cli.replay_archive --archive archive/ --output ndjson --path reprocessed.ndjson
+    python -m app.cli.replay_archive --archive archive/ https://store.example --output db
+    python -m app.cli.replay_archive --archive archive/ --output parquet --path reprocessed/ --processes 8
+
+The archive is written by the API (ARCHIVE_DIR) or by app.cli.bulk_scrape --archive. Stores are
+spread over worker processes, so re-processing is bound by CPU rather than by the stores. Pages
+a live scrape would fetch but the archive lacks are answered with 404 and counted as misses.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+from app.cli.bulk_scrape import Stats, _open_writer
+from app.cli.common import read_urls
+from app.core.config import settings
+from app.schemas.brand import BrandInsights
+from app.services.resilience import Deadline
+
+# Per-process scraper, created by _init_worker
+_scraper = None
+
+
+def _init_worker(root: str) -> None:
+    from app.services.page_archive import PageArchive
+    from app.services.shopify_scraper import ShopifyScraper
+
+    global _scraper
+    _scraper = ShopifyScraper(archive=PageArchive(root), replay=True)
+
+
+def _replay_store(url: str, deadline: float) -> Tuple[str, Optional[str], Optional[str], int]:
+    """(url, insights JSON, error, archive misses) for one store; runs in a worker process"""
+    misses = len(_scraper.archive.misses)
+    try:
+        insights = asyncio.run(_scraper.scrape_brand_insights(url, Deadline(deadline)))
+        return url, insights.json(), None, len(_scraper.archive.misses) - misses
+    except Exception as e:
+        return url, None, str(e), len(_scraper.archive.misses) - misses
+
+
+def _replay(args: argparse.Namespace) -> int:
+    from app.services.page_archive import PageArchive
+
+    urls = read_urls(args.urls) or PageArchive(args.archive).stores()
+    if not urls:
+        print(f"No archived stores in {args.archive}", file=sys.stderr)
+        return 2
+
+    writer = _open_writer(args)
+    stats = Stats(len(urls))
+    misses = 0
+    try:
+        with ProcessPoolExecutor(args.processes, initializer=_init_worker, initargs=(args.archive,)) as pool:
+            futures = [pool.submit(_replay_store, url, args.deadline) for url in urls]
+            for future in as_completed(futures):
+                url, payload, error, store_misses = future.result()
+                misses += store_misses
+                if error is not None:
+                    stats.failed += 1
+                    print(f"{url}: {error}", file=sys.stderr)
+                    continue
+
+                insights = BrandInsights.parse_raw(payload)
+                writer.write(insights)
+                stats.ok += 1
+                stats.products += len(insights.product_catalog or [])
+    finally:
+        writer.close()
+
+    print(f"{stats.line()}; {misses} requests not in the archive", file=sys.stderr)
+    return 0 if stats.failed == 0 else 1
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-extract brand insights from archived responses, offline")
+    parser.add_argument('urls', nargs='*', help="Store URLs (default: every store in the archive)")
+    parser.add_argument('--archive', default=settings.ARCHIVE_DIR, required=not settings.ARCHIVE_DIR,
+                        help="Archive directory (default: ARCHIVE_DIR)")
+    parser.add_argument('--output', choices=['db', 'ndjson', 'parquet'], default='ndjson')
+    parser.add_argument('--path', help="NDJSON file or Parquet directory (defaults: insights.ndjson, insights_parquet/)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--deadline', type=float, default=settings.SCRAPE_DEADLINE, help="Seconds allowed per store")
+    parser.add_argument('--batch-size', type=int, default=settings.BULK_PARQUET_BATCH_SIZE, help="Stores per Parquet part file")
+    args = parser.parse_args(argv)
+
+    try:
+        return _replay(args)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn
-from typing import Optional
+from typing import Optional, Dict
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
@@ -12,9 +12,103 @@ class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
     
     # Web scraping settings
-    REQUEST_TIMEOUT: int = 30
+    # Per-request connect/read timeouts, per-stage timeout and overall scrape deadline (seconds)
+    CONNECT_TIMEOUT: float = 5
+    READ_TIMEOUT: float = 15
+    STAGE_TIMEOUT: float = 45
+    SCRAPE_DEADLINE: float = 120
+    MAX_SCRAPE_DEADLINE: float = 300
+    
+    # Consecutive failures before a host's circuit opens, and how long it stays open
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 60
+    # Hosts whose breakers are kept; the least recently used are dropped beyond this
+    CIRCUIT_MAX_HOSTS: int = 10000
+    
+    # Pooled connections per host for the shared HTTP session, and threads for blocking fetches and parsing
+    HTTP_POOL_SIZE: int = 32
+    WORKER_THREADS: int = 32
+    
+    # Maximum response body size per resource type (bytes); larger bodies are aborted mid-stream
+    MAX_BODY_BYTES: Dict[str, int] = {"html": 5 * 1024 * 1024, "json": 2 * 1024 * 1024, "products": 25 * 1024 * 1024}
+    MAX_JSON_ITEM_BYTES: int = 2 * 1024 * 1024
+    # Compressed bodies may expand at most this many times; checked once DECOMPRESSION_CHECK_BYTES are decoded
+    MAX_DECOMPRESSION_RATIO: int = 100
+    DECOMPRESSION_CHECK_BYTES: int = 1024 * 1024
+    # Hosts reported individually on /metrics; the least recently fetched are dropped beyond this
+    TRANSFER_METRICS_MAX_HOSTS: int = 1000
     MAX_RETRIES: int = 3
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    
+    # State shared by uvicorn workers: unset for in-process, sqlite:///./shared_state.db or redis://host:6379/0
+    SHARED_STATE_URL: Optional[str] = None
+    # Seconds a scrape result is served from the shared cache (0 disables caching)
+    RESULT_CACHE_TTL: float = 300
+    # Partial results (stages cut short) are only shared with requests already waiting for the store
+    PARTIAL_RESULT_CACHE_TTL: float = 10
+    SHARED_POLL_INTERVAL: float = 0.5
+    
+    # API response compression (bytes threshold and per-coding levels)
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    ZSTD_LEVEL: int = 3
+    
+    # Large JSON/Text columns are zlib-compressed above this size (bytes)
+    COLUMN_COMPRESSION_MIN_SIZE: int = 256
+    COLUMN_COMPRESSION_LEVEL: int = 6
+    
+    # Candidate pages that returned 404/410 are skipped for this long per store (seconds); probe order is
+    # learned from how often each candidate path yields content across stores
+    PROBE_CACHE_ENABLED: bool = True
+    NEGATIVE_CACHE_TTL: float = 7 * 24 * 3600
+    # Once a page type's best path has yielded content somewhere, prefetching page types request this many
+    # candidates one at a time before requesting the rest at once
+    PROBE_SEQUENTIAL_CANDIDATES: int = 1
+    
+    # Raw response archive for offline re-extraction: directory to archive into (unset disables) and zlib level
+    ARCHIVE_DIR: Optional[str] = None
+    ARCHIVE_COMPRESSION_LEVEL: int = 6
+    
+    # FAQ extraction: maximum questions kept and characters per question/answer
+    MAX_FAQS: int = 20
+    FAQ_MAX_QUESTION_CHARS: int = 300
+    FAQ_MAX_ANSWER_CHARS: int = 2000
+    
+    # Country calling code assumed for phone numbers written without one
+    DEFAULT_PHONE_COUNTRY_CODE: str = "1"
+    
+    # Product catalog crawl settings
+    PRODUCTS_PAGE_LIMIT: int = 250
+    MAX_PRODUCT_PAGES: int = 100
+    MAX_COLLECTIONS: int = 250
+    MAX_COLLECTION_PAGES: int = 10
+    COLLECTION_CONCURRENCY: int = 5
+    HERO_PRODUCTS_LIMIT: int = 10
+    HERO_PRODUCT_CONCURRENCY: int = 5
+    
+    # Catalog export settings
+    EXPORT_CHUNK_SIZE: int = 5000
+    
+    # Bulk scraper CLI settings
+    BULK_CONCURRENCY: int = 16
+    BULK_PARQUET_BATCH_SIZE: int = 500
+    
+    # Catalog analytics settings
+    ANALYTICS_HISTOGRAM_BINS: int = 10
+    ANALYTICS_CACHE_SIZE: int = 128
+    
+    # Refresh scheduler settings (intervals in seconds)
+    REFRESH_SCHEDULER_ENABLED: bool = False
+    REFRESH_CONCURRENCY: int = 4
+    REFRESH_POLL_INTERVAL: float = 30
+    REFRESH_INITIAL_INTERVALS: Dict[str, float] = {"catalog": 6 * 3600, "content": 24 * 3600}
+    REFRESH_MIN_INTERVAL: float = 15 * 60
+    REFRESH_MAX_INTERVAL: float = 7 * 24 * 3600
+    REFRESH_SPEEDUP_FACTOR: float = 0.5
+    REFRESH_BACKOFF_FACTOR: float = 1.5
+    # How long a claimed schedule stays hidden from other workers before it is considered abandoned
+    REFRESH_CLAIM_TIMEOUT: float = 600
 
     class Config:
         case_sensitive = True
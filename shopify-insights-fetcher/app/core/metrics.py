@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+from typing import Dict
+from app.core.config import settings
+
+
+class HostTransferStats:
+    """Bytes received from one host: as sent on the wire and after content decoding"""
+
+    def __init__(self):
+        self.requests = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.rejected = 0
+        self.encodings: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "compression_ratio": round(self.decoded_bytes / self.wire_bytes, 2) if self.wire_bytes else None,
+            "rejected": self.rejected,
+            "encodings": dict(self.encodings),
+        }
+
+
+class TransferMetrics:
+    """
+    Process-wide transfer counters, updated from the fetch threads; totals cover every host,
+    per-host counters only the TRANSFER_METRICS_MAX_HOSTS most recently fetched
+    """
+
+    def __init__(self):
+        self._hosts: "OrderedDict[str, HostTransferStats]" = OrderedDict()
+        self._total = HostTransferStats()
+        self._lock = threading.Lock()
+
+    def record(self, host: str, encoding: str, wire_bytes: int, decoded_bytes: int, rejected: bool = False) -> None:
+        with self._lock:
+            stats = self._hosts.get(host)
+            if stats is None:
+                stats = self._hosts[host] = HostTransferStats()
+                while len(self._hosts) > settings.TRANSFER_METRICS_MAX_HOSTS:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(host)
+
+            for counters in (stats, self._total):
+                counters.requests += 1
+                counters.wire_bytes += wire_bytes
+                counters.decoded_bytes += decoded_bytes
+                counters.encodings[encoding] = counters.encodings.get(encoding, 0) + 1
+                if rejected:
+                    counters.rejected += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            total = self._total.as_dict()
+            hosts = {host: stats.as_dict() for host, stats in self._hosts.items()}
+
+        return {
+            "total": {key: total[key] for key in ("requests", "wire_bytes", "decoded_bytes", "compression_ratio")},
+            "hosts": hosts,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+            self._total = HostTransferStats()
+
+
+transfer_metrics = TransferMetrics()
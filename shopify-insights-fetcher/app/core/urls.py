@@ -0,0 +1,16 @@
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(website_url: str) -> str:
+    """
+    Canonical form of a store URL, used wherever stores are persisted or looked up
+
+    Bare domains get https://, the scheme and host are lowercased and an empty path becomes
+    '/', which is also how pydantic's HttpUrl spells a store's root.
+    """
+    website_url = website_url.strip()
+    if not website_url.lower().startswith(('http://', 'https://')):
+        website_url = 'https://' + website_url
+
+    parts = urlsplit(website_url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
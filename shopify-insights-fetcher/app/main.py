@@ -1,13 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.json_codec import FastJSONResponse
 from app.api.api_v1.api import api_router
+from app.services.database import create_tables, engine
+from app.services.fetching import create_session
+from app.services.page_archive import PageArchive
+from app.services.probe_cache import ProbeCache
+from app.services.refresh_scheduler import RefreshScheduler
+from app.services.shared_state import create_shared_state
+from app.services.shopify_scraper import ShopifyScraper
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the resources shared by every request once, and release them on shutdown"""
+    create_tables()
+    app.state.http_session = create_session(settings.HTTP_POOL_SIZE)
+    app.state.executor = ThreadPoolExecutor(max_workers=settings.WORKER_THREADS, thread_name_prefix="scraper")
+    app.state.shared_state = create_shared_state(settings.SHARED_STATE_URL)
+    app.state.probe_cache = ProbeCache() if settings.PROBE_CACHE_ENABLED else None
+    app.state.page_archive = PageArchive(settings.ARCHIVE_DIR) if settings.ARCHIVE_DIR else None
+    app.state.refresh_scheduler = RefreshScheduler(
+        scraper_factory=lambda: ShopifyScraper(
+            session=app.state.http_session, executor=app.state.executor,
+            probe_cache=app.state.probe_cache, archive=app.state.page_archive
+        )
+    )
+    if settings.REFRESH_SCHEDULER_ENABLED:
+        await app.state.refresh_scheduler.start()
+
+    try:
+        yield
+    finally:
+        await app.state.refresh_scheduler.stop()
+        app.state.shared_state.close()
+        app.state.executor.shutdown(wait=True, cancel_futures=True)
+        app.state.http_session.close()
+        engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="A robust API for scraping and analyzing Shopify store insights",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -19,6 +61,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (catalogs, exports) for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
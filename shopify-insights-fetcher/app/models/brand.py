@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, Float, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
+from app.models.types import CompressedJSON, CompressedText
 
 Base = declarative_base()
 
@@ -11,20 +12,27 @@ class Brand(Base):
     website_url = Column(String(500), unique=True, index=True, nullable=False)
     brand_name = Column(String(255), nullable=True)
     scraped_at = Column(DateTime, default=datetime.utcnow)
+    store_fingerprint = Column(JSON, nullable=True)  # platform, theme and features from detection
     
     # Brand insights
-    product_catalog = Column(JSON, nullable=True)
-    hero_products = Column(JSON, nullable=True)
-    privacy_policy = Column(Text, nullable=True)
-    return_refund_policy = Column(Text, nullable=True)
-    faqs = Column(JSON, nullable=True)
+    product_catalog = Column(CompressedJSON, nullable=True)
+    collections = Column(CompressedJSON, nullable=True)
+    product_collections = Column(CompressedJSON, nullable=True)  # product id -> collection handles
+    hero_products = Column(CompressedJSON, nullable=True)
+    # Long text fields live in text_blobs, referenced by content hash; the text columns only hold legacy rows
+    privacy_policy = Column(CompressedText, nullable=True)
+    privacy_policy_hash = Column(String(64), index=True, nullable=True)
+    return_refund_policy = Column(CompressedText, nullable=True)
+    return_refund_policy_hash = Column(String(64), index=True, nullable=True)
+    faqs = Column(CompressedJSON, nullable=True)
     social_handles = Column(JSON, nullable=True)
     contact_details = Column(JSON, nullable=True)
-    brand_context = Column(Text, nullable=True)
+    brand_context = Column(CompressedText, nullable=True)
+    brand_context_hash = Column(String(64), index=True, nullable=True)
     important_links = Column(JSON, nullable=True)
     
     # Additional insights
-    additional_data = Column(JSON, nullable=True)
+    additional_data = Column(CompressedJSON, nullable=True)
     
     # Metadata
     scraping_status = Column(String(50), default="pending")  # pending, completed, failed
@@ -32,4 +40,64 @@ class Brand(Base):
     
     # Bonus features
     competitors = Column(JSON, nullable=True)
-    is_active = Column(Boolean, default=True)
\ No newline at end of file
+    is_active = Column(Boolean, default=True)
+
+
+class TextBlob(Base):
+    __tablename__ = "text_blobs"
+    
+    # sha256 of the text; identical policies across stores share one row
+    hash = Column(String(64), primary_key=True)
+    content = Column(CompressedText, nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class MissingPath(Base):
+    __tablename__ = "missing_paths"
+    __table_args__ = (UniqueConstraint("store", "path"),)
+    
+    # Candidate page that answered 404/410 for a store; not probed again until it expires
+    id = Column(Integer, primary_key=True, index=True)
+    store = Column(String(255), index=True, nullable=False)  # host of the store
+    path = Column(String(255), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    checked_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True, nullable=False)
+
+
+class ProbeStat(Base):
+    __tablename__ = "probe_stats"
+    
+    # How often a candidate path yielded content for its stage, across all stores
+    probe_group = Column(String(50), primary_key=True)  # privacy_policy, return_policy, faqs, contact, about
+    path = Column(String(255), primary_key=True)
+    hits = Column(Integer, default=0, nullable=False)
+    misses = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RefreshSchedule(Base):
+    __tablename__ = "refresh_schedules"
+    __table_args__ = (UniqueConstraint("website_url", "section"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    website_url = Column(String(500), index=True, nullable=False)
+    section = Column(String(50), nullable=False)  # catalog, content
+    
+    # Adaptive interval and the next time the section is due
+    interval_seconds = Column(Float, nullable=False)
+    next_run_at = Column(DateTime, index=True, nullable=False)
+    last_run_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)
+    
+    # Change detection
+    etag = Column(String(255), nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    last_delta = Column(Integer, nullable=True)  # products added, removed or changed on the last refresh
+    run_count = Column(Integer, default=0)
+    change_count = Column(Integer, default=0)
+    
+    last_error = Column(Text, nullable=True)
+    is_active = Column(Boolean, default=True)
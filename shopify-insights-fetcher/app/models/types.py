@@ -0,0 +1,62 @@
+import zlib
+from typing import Any, Optional
+from sqlalchemy.types import LargeBinary, TypeDecorator
+from app.core import json_codec
+from app.core.config import settings
+
+# First byte of a stored value: how the rest of it is encoded
+RAW = b'\x00'
+ZLIB = b'\x01'
+
+
+def _pack(data: bytes) -> bytes:
+    """Compress values above the threshold; small ones are kept raw behind a tag byte"""
+    if len(data) < settings.COLUMN_COMPRESSION_MIN_SIZE:
+        return RAW + data
+    return ZLIB + zlib.compress(data, settings.COLUMN_COMPRESSION_LEVEL)
+
+
+def _unpack(value: Any) -> Optional[bytes]:
+    """Inverse of _pack; values written before compression come back as plain text"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    value = bytes(value)
+    if value[:1] == ZLIB:
+        return zlib.decompress(value[1:])
+    if value[:1] == RAW:
+        return value[1:]
+    return value
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON stored as (optionally zlib-compressed) bytes; reads uncompressed legacy rows too"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return _pack(json_codec.dumps(value))
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        data = _unpack(value)
+        return json_codec.loads(data) if data is not None else None
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as (optionally zlib-compressed) UTF-8 bytes"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return _pack(value.encode('utf-8'))
+
+    def process_result_value(self, value: Any, dialect) -> Optional[str]:
+        data = _unpack(value)
+        return data.decode('utf-8') if data is not None else None
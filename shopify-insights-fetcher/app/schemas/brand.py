@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -27,6 +27,8 @@ class SocialHandles(BaseModel):
     tiktok: Optional[str] = None
     youtube: Optional[str] = None
     linkedin: Optional[str] = None
+    # Account names parsed from the profile URLs above, keyed by platform
+    handles: Optional[Dict[str, str]] = None
 
 class FAQ(BaseModel):
     question: str
@@ -39,10 +41,32 @@ class ImportantLinks(BaseModel):
     about_us: Optional[str] = None
     shipping_info: Optional[str] = None
 
+class CollectionInfo(BaseModel):
+    id: Optional[str] = None
+    handle: str
+    title: Optional[str] = None
+    products_count: Optional[int] = None
+    product_ids: List[str] = []
+
+class StoreFingerprint(BaseModel):
+    is_shopify: bool = False
+    signals: List[str] = []
+    shop_id: Optional[str] = None
+    myshopify_domain: Optional[str] = None
+    theme_name: Optional[str] = None
+    theme_id: Optional[str] = None
+    theme_store_id: Optional[str] = None
+    currency: Optional[str] = None
+    locale: Optional[str] = None
+    features: List[str] = []
+
 class BrandInsights(BaseModel):
     website_url: str
     brand_name: Optional[str] = None
+    store_fingerprint: Optional[StoreFingerprint] = None
     product_catalog: Optional[List[ProductInfo]] = None
+    collections: Optional[List[CollectionInfo]] = None
+    product_collections: Optional[Dict[str, List[str]]] = None
     hero_products: Optional[List[ProductInfo]] = None
     privacy_policy: Optional[str] = None
     return_refund_policy: Optional[str] = None
@@ -57,9 +81,61 @@ class BrandInsights(BaseModel):
 
 class BrandRequest(BaseModel):
     website_url: HttpUrl
+    deadline_seconds: Optional[float] = Field(None, gt=0)
 
 class BrandResponse(BaseModel):
     success: bool
     data: Optional[BrandInsights] = None
     error: Optional[str] = None
-    status_code: int = 200
\ No newline at end of file
+    status_code: int = 200
+
+class HistogramBucket(BaseModel):
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+    count: int = 0
+
+class PriceDistribution(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    p25: Optional[float] = None
+    median: Optional[float] = None
+    p75: Optional[float] = None
+    histogram: Optional[List[HistogramBucket]] = None
+
+class CatalogAnalytics(BaseModel):
+    website_url: Optional[str] = None
+    store_count: int = 0
+    product_count: int = 0
+    variant_count: int = 0
+    price: Optional[PriceDistribution] = None
+    discounted_variant_ratio: Optional[float] = None
+    mean_discount_pct: Optional[float] = None
+    max_discount_pct: Optional[float] = None
+    variant_stock_out_ratio: Optional[float] = None
+    product_stock_out_ratio: Optional[float] = None
+    vendors: Optional[Dict[str, int]] = None
+    product_types: Optional[Dict[str, int]] = None
+
+class CatalogAnalyticsResponse(BaseModel):
+    stores: List[CatalogAnalytics]
+    cohort: Optional[CatalogAnalytics] = None
+
+class WatchRequest(BaseModel):
+    website_url: HttpUrl
+
+class RefreshScheduleInfo(BaseModel):
+    website_url: str
+    section: str
+    interval_seconds: float
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    last_changed_at: Optional[datetime] = None
+    last_delta: Optional[int] = None
+    run_count: int = 0
+    change_count: int = 0
+    last_error: Optional[str] = None
+    is_active: bool = True
+
+    class Config:
+        from_attributes = True
@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from app.models.brand import Brand
+from app.core.urls import normalize_url
 from app.schemas.brand import BrandInsights
+from app.services.text_store import TextStore, text_hash
 from datetime import datetime
 import json
 
+# Long text fields stored by content hash in text_blobs
+TEXT_FIELDS = ('privacy_policy', 'return_refund_policy', 'brand_context')
+
 class BrandService:
     """Service for managing brand data in database"""
     
@@ -17,6 +22,10 @@ class BrandService:
         if insights.product_catalog:
             product_catalog_json = [product.dict() for product in insights.product_catalog]
             
+        collections_json = None
+        if insights.collections:
+            collections_json = [collection.dict() for collection in insights.collections]
+            
         hero_products_json = None
         if insights.hero_products:
             hero_products_json = [product.dict() for product in insights.hero_products]
@@ -40,14 +49,17 @@ class BrandService:
         db_brand = Brand(
             website_url=insights.website_url,
             brand_name=insights.brand_name,
+            store_fingerprint=insights.store_fingerprint.dict() if insights.store_fingerprint else None,
             product_catalog=product_catalog_json,
+            collections=collections_json,
+            product_collections=insights.product_collections,
             hero_products=hero_products_json,
-            privacy_policy=insights.privacy_policy,
-            return_refund_policy=insights.return_refund_policy,
+            privacy_policy_hash=TextStore.put(db, insights.privacy_policy),
+            return_refund_policy_hash=TextStore.put(db, insights.return_refund_policy),
             faqs=faqs_json,
             social_handles=social_handles_json,
             contact_details=contact_details_json,
-            brand_context=insights.brand_context,
+            brand_context_hash=TextStore.put(db, insights.brand_context),
             important_links=important_links_json,
             additional_data=insights.additional_data,
             scraping_status=insights.scraping_status,
@@ -62,8 +74,8 @@ class BrandService:
     
     @staticmethod
     def get_brand_by_url(db: Session, website_url: str) -> Optional[Brand]:
-        """Get brand record by website URL"""
-        return db.query(Brand).filter(Brand.website_url == website_url).first()
+        """Get brand record by website URL, in any spelling normalize_url maps to the stored one"""
+        return db.query(Brand).filter(Brand.website_url == normalize_url(website_url)).first()
     
     @staticmethod
     def get_all_brands(db: Session, skip: int = 0, limit: int = 100) -> List[Brand]:
@@ -80,10 +92,15 @@ class BrandService:
             db_brand.brand_name = insights.brand_name
             db_brand.scraped_at = datetime.utcnow()
             db_brand.scraping_status = insights.scraping_status
+            if insights.store_fingerprint:
+                db_brand.store_fingerprint = insights.store_fingerprint.dict()
             
             # Update JSON fields
             if insights.product_catalog:
                 db_brand.product_catalog = [product.dict() for product in insights.product_catalog]
+            if insights.collections:
+                db_brand.collections = [collection.dict() for collection in insights.collections]
+                db_brand.product_collections = insights.product_collections
             if insights.hero_products:
                 db_brand.hero_products = [product.dict() for product in insights.hero_products]
             if insights.faqs:
@@ -95,9 +112,11 @@ class BrandService:
             if insights.important_links:
                 db_brand.important_links = insights.important_links.dict()
                 
-            db_brand.privacy_policy = insights.privacy_policy
-            db_brand.return_refund_policy = insights.return_refund_policy
-            db_brand.brand_context = insights.brand_context
+            # Unchanged text keeps its hash without touching text_blobs
+            for field in TEXT_FIELDS:
+                hash_column = f'{field}_hash'
+                setattr(db_brand, hash_column, TextStore.replace(db, getattr(db_brand, hash_column), getattr(insights, field)))
+                setattr(db_brand, field, None)
             db_brand.additional_data = insights.additional_data
             
             db.commit()
@@ -105,12 +124,98 @@ class BrandService:
             
         return db_brand
     
+    @staticmethod
+    def update_sections(db: Session, db_brand: Brand, insights: BrandInsights, fields: Iterable[str]) -> None:
+        """Overwrite only `fields` of a stored brand, e.g. after a section refresh; the caller commits"""
+        fields = list(fields)
+        content = insights.dict(include=set(fields))
+        
+        for field in fields:
+            if field in TEXT_FIELDS:
+                hash_column = f'{field}_hash'
+                setattr(db_brand, hash_column, TextStore.replace(db, getattr(db_brand, hash_column), content[field]))
+                setattr(db_brand, field, None)
+            elif content[field]:
+                setattr(db_brand, field, content[field])
+    
+    @staticmethod
+    def save_insights(db: Session, insights: BrandInsights) -> Brand:
+        """Create or refresh the brand record for a scraped store"""
+        # API and CLI callers spell URLs differently; every store is kept under its canonical URL
+        insights.website_url = normalize_url(insights.website_url)
+        db_brand = BrandService.get_brand_by_url(db, insights.website_url)
+        
+        if db_brand:
+            return BrandService.update_brand_record(db, db_brand.id, insights)
+            
+        return BrandService.create_brand_record(db, insights)
+    
+    @staticmethod
+    def get_collection_products(db: Session, website_url: str, handle: str) -> Optional[List[dict]]:
+        """Resolve a stored collection's product ids against the stored catalog"""
+        db_brand = BrandService.get_brand_by_url(db, website_url)
+        
+        if not db_brand or not db_brand.collections:
+            return None
+            
+        collection = next((c for c in db_brand.collections if c.get('handle') == handle), None)
+        if collection is None:
+            return None
+            
+        catalog = {product.get('id'): product for product in db_brand.product_catalog or []}
+        return [catalog[product_id] for product_id in collection.get('product_ids', []) if product_id in catalog]
+    
+    @staticmethod
+    def get_brand_texts(db: Session, db_brand: Brand) -> Dict[str, Optional[str]]:
+        """Resolve a brand's hashed text fields, falling back to text stored inline by older rows"""
+        contents = TextStore.get_many(db, (getattr(db_brand, f'{field}_hash') for field in TEXT_FIELDS))
+        return {
+            field: contents.get(getattr(db_brand, f'{field}_hash')) or getattr(db_brand, field)
+            for field in TEXT_FIELDS
+        }
+    
+    @staticmethod
+    def get_insights(db: Session, website_url: str) -> Optional[BrandInsights]:
+        """Stored insights of a store, with its text fields resolved from the text store"""
+        db_brand = BrandService.get_brand_by_url(db, website_url)
+        
+        if not db_brand:
+            return None
+            
+        return BrandInsights(
+            website_url=db_brand.website_url,
+            brand_name=db_brand.brand_name,
+            store_fingerprint=db_brand.store_fingerprint,
+            product_catalog=db_brand.product_catalog,
+            collections=db_brand.collections,
+            product_collections=db_brand.product_collections,
+            hero_products=db_brand.hero_products,
+            faqs=db_brand.faqs,
+            social_handles=db_brand.social_handles,
+            contact_details=db_brand.contact_details,
+            important_links=db_brand.important_links,
+            additional_data=db_brand.additional_data,
+            scraped_at=db_brand.scraped_at,
+            scraping_status=db_brand.scraping_status or "completed",
+            **BrandService.get_brand_texts(db, db_brand)
+        )
+    
+    @staticmethod
+    def text_changed(db_brand: Brand, field: str, text: Optional[str]) -> bool:
+        """Whether `text` differs from the stored value of a text field, compared by hash only"""
+        stored_hash = getattr(db_brand, f'{field}_hash')
+        if stored_hash is None and getattr(db_brand, field) is not None:
+            stored_hash = text_hash(getattr(db_brand, field))
+        return stored_hash != text_hash(text)
+    
     @staticmethod
     def delete_brand_record(db: Session, brand_id: int) -> bool:
         """Delete brand record"""
         db_brand = db.query(Brand).filter(Brand.id == brand_id).first()
         
         if db_brand:
+            for field in TEXT_FIELDS:
+                TextStore.release(db, getattr(db_brand, f'{field}_hash'))
             db.delete(db_brand)
             db.commit()
             return True
@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.brand import Brand
+from app.schemas.brand import CatalogAnalytics, CatalogAnalyticsResponse, PriceDistribution, HistogramBucket
+from app.services.catalog_export import product_rows, variant_rows, normalize_url
+
+
+def _optional(value: Any) -> Optional[float]:
+    """Convert NumPy scalars to plain floats, mapping NaN to None"""
+    if value is None or pd.isna(value):
+        return None
+    return round(float(value), 4)
+
+
+def _price_distribution(prices: pd.Series, bins: int) -> PriceDistribution:
+    """Summarize variant prices with quantiles and a fixed-width histogram"""
+    prices = prices.dropna()
+    if prices.empty:
+        return PriceDistribution()
+
+    quantiles = prices.quantile([0.25, 0.5, 0.75]).to_numpy()
+    counts, edges = np.histogram(prices.to_numpy(), bins=bins)
+
+    return PriceDistribution(
+        min=_optional(prices.min()),
+        max=_optional(prices.max()),
+        mean=_optional(prices.mean()),
+        p25=_optional(quantiles[0]),
+        median=_optional(quantiles[1]),
+        p75=_optional(quantiles[2]),
+        histogram=[
+            HistogramBucket(lower=_optional(edges[i]), upper=_optional(edges[i + 1]), count=int(counts[i]))
+            for i in range(len(counts))
+        ]
+    )
+
+
+def _breakdown(values: pd.Series, top: int) -> Dict[str, int]:
+    """Count the most common values of a categorical column"""
+    counts = values.replace('', np.nan).dropna().value_counts().head(top)
+    return {str(key): int(count) for key, count in counts.items()}
+
+
+def _summarize(products: pd.DataFrame, variants: pd.DataFrame, website_url: Optional[str], top: int) -> CatalogAnalytics:
+    """Compute the analytics for one store, or for a whole cohort when website_url is None"""
+    analytics = CatalogAnalytics(
+        website_url=website_url,
+        store_count=int(products['website_url'].nunique()) if not products.empty else 0,
+        product_count=len(products),
+        variant_count=len(variants)
+    )
+
+    if not variants.empty:
+        price = variants['price']
+        compare_at = variants['compare_at_price']
+
+        # Discount depth is only meaningful where compare_at_price is above the selling price
+        discounted = compare_at.gt(price) & price.notna()
+        depth = ((compare_at - price) / compare_at).where(discounted)
+
+        analytics.price = _price_distribution(price, settings.ANALYTICS_HISTOGRAM_BINS)
+        analytics.discounted_variant_ratio = _optional(discounted.mean())
+        analytics.mean_discount_pct = _optional(depth.mean() * 100)
+        analytics.max_discount_pct = _optional(depth.max() * 100)
+
+        available = variants['available'].dropna()
+        if not available.empty:
+            analytics.variant_stock_out_ratio = _optional(1 - available.astype(bool).mean())
+
+    if not products.empty:
+        available = products['available'].dropna()
+        if not available.empty:
+            analytics.product_stock_out_ratio = _optional(1 - available.astype(bool).mean())
+
+        analytics.vendors = _breakdown(products['vendor'], top)
+        analytics.product_types = _breakdown(products['product_type'], top)
+
+    return analytics
+
+
+class CatalogAnalyticsService:
+    """Vectorized analytics over stored catalogs, cached until a catalog is re-scraped"""
+
+    _cache: "OrderedDict[Tuple, CatalogAnalyticsResponse]" = OrderedDict()
+    # Requests are served from the threadpool, so cache updates are serialized
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def _catalog_versions(db: Session, website_urls: Optional[List[str]]) -> List[Tuple[int, str, Any]]:
+        """Look up (id, website_url, scraped_at) of the matching stored catalogs without loading them"""
+        query = db.query(Brand.id, Brand.website_url, Brand.scraped_at).filter(Brand.product_catalog.isnot(None))
+        if website_urls:
+            query = query.filter(Brand.website_url.in_([normalize_url(url) for url in website_urls]))
+        return query.order_by(Brand.website_url).all()
+
+    @staticmethod
+    def _load_frames(db: Session, brand_ids: List[int]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Build product and variant frames for the selected stores"""
+        products: List[Dict[str, Any]] = []
+        variants: List[Dict[str, Any]] = []
+
+        for brand in db.query(Brand).filter(Brand.id.in_(brand_ids)).yield_per(1):
+            products.extend(product_rows(brand.website_url, brand.product_catalog))
+            variants.extend(variant_rows(brand.website_url, brand.product_catalog))
+
+        product_frame = pd.DataFrame.from_records(products, columns=['website_url', 'vendor', 'product_type', 'available'])
+        variant_frame = pd.DataFrame.from_records(variants, columns=['website_url', 'price', 'compare_at_price', 'available'])
+        variant_frame[['price', 'compare_at_price']] = variant_frame[['price', 'compare_at_price']].astype('float64')
+
+        return product_frame, variant_frame
+
+    @staticmethod
+    def get_analytics(db: Session, website_urls: Optional[List[str]] = None, top: int = 10) -> Optional[CatalogAnalyticsResponse]:
+        """Compute per-store and cohort analytics for the given stores (all stores when omitted)"""
+        versions = CatalogAnalyticsService._catalog_versions(db, website_urls)
+        if not versions:
+            return None
+
+        cache = CatalogAnalyticsService._cache
+        cache_key = (tuple((url, scraped_at) for _, url, scraped_at in versions), top)
+
+        with CatalogAnalyticsService._cache_lock:
+            if cache_key in cache:
+                cache.move_to_end(cache_key)
+                return cache[cache_key]
+
+        products, variants = CatalogAnalyticsService._load_frames(db, [brand_id for brand_id, _, _ in versions])
+
+        product_groups = dict(tuple(products.groupby('website_url', sort=False)))
+        variant_groups = dict(tuple(variants.groupby('website_url', sort=False)))
+
+        stores = [
+            _summarize(
+                product_groups.get(url, products.iloc[0:0]),
+                variant_groups.get(url, variants.iloc[0:0]),
+                url,
+                top
+            )
+            for _, url, _ in versions
+        ]
+
+        response = CatalogAnalyticsResponse(
+            stores=stores,
+            cohort=_summarize(products, variants, None, top) if len(versions) > 1 else None
+        )
+
+        with CatalogAnalyticsService._cache_lock:
+            cache[cache_key] = response
+            while len(cache) > settings.ANALYTICS_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return response
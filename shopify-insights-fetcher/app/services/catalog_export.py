@@ -0,0 +1,334 @@
+import csv
+import io
+from typing import Optional, List, Dict, Any, Iterable, Iterator, AsyncIterator, Tuple, Callable
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.urls import normalize_url
+from app.models.brand import Brand
+
+# Column layout of each exportable table as (name, logical type)
+PRODUCT_COLUMNS: List[Tuple[str, str]] = [
+    ('website_url', 'string'),
+    ('product_id', 'int64'),
+    ('title', 'string'),
+    ('handle', 'string'),
+    ('vendor', 'string'),
+    ('product_type', 'string'),
+    ('tags', 'string'),
+    ('available', 'bool'),
+    ('price', 'float64'),
+    ('compare_at_price', 'float64'),
+    ('variant_count', 'int32'),
+    ('image_count', 'int32'),
+]
+
+VARIANT_COLUMNS: List[Tuple[str, str]] = [
+    ('website_url', 'string'),
+    ('product_id', 'int64'),
+    ('variant_id', 'int64'),
+    ('title', 'string'),
+    ('sku', 'string'),
+    ('option1', 'string'),
+    ('option2', 'string'),
+    ('option3', 'string'),
+    ('available', 'bool'),
+    ('price', 'float64'),
+    ('compare_at_price', 'float64'),
+    ('grams', 'int64'),
+]
+
+TABLE_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    'products': PRODUCT_COLUMNS,
+    'variants': VARIANT_COLUMNS,
+}
+
+# pyarrow type factory for each logical column type
+ARROW_TYPES: Dict[str, str] = {
+    'string': 'string',
+    'int32': 'int32',
+    'int64': 'int64',
+    'float64': 'float64',
+    'bool': 'bool_',
+}
+
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Parse a Shopify money string such as "19.99" into a float"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """Parse an integer id that may arrive as int or string"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    """Keep availability flags nullable instead of coercing missing values to False"""
+    if value is None:
+        return None
+    return bool(value)
+
+
+def _join_tags(tags: Any) -> Optional[str]:
+    """Tags are a comma separated string on /products.json and a list once stored"""
+    if not tags:
+        return None
+    if isinstance(tags, str):
+        return tags
+    return ','.join(tag.strip() for tag in tags)
+
+
+def product_rows(website_url: str, products: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten raw or stored products into typed product rows"""
+    rows = []
+
+    for product in products:
+        variants = product.get('variants') or []
+        first_variant = variants[0] if variants else {}
+
+        # Stored ProductInfo rows carry their own price, raw pages only have it on variants
+        price = product.get('price', first_variant.get('price'))
+        compare_at_price = product.get('compare_at_price', first_variant.get('compare_at_price'))
+
+        available = product.get('available')
+        if available is None and variants:
+            available = any(variant.get('available') for variant in variants)
+
+        rows.append({
+            'website_url': website_url,
+            'product_id': _to_int(product.get('id')),
+            'title': product.get('title'),
+            'handle': product.get('handle'),
+            'vendor': product.get('vendor'),
+            'product_type': product.get('product_type'),
+            'tags': _join_tags(product.get('tags')),
+            'available': _to_bool(available),
+            'price': _to_float(price),
+            'compare_at_price': _to_float(compare_at_price),
+            'variant_count': len(variants),
+            'image_count': len(product.get('images') or []),
+        })
+
+    return rows
+
+
+def variant_rows(website_url: str, products: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten the variants of raw or stored products into typed variant rows"""
+    rows = []
+
+    for product in products:
+        product_id = _to_int(product.get('id'))
+
+        for variant in product.get('variants') or []:
+            rows.append({
+                'website_url': website_url,
+                'product_id': product_id,
+                'variant_id': _to_int(variant.get('id')),
+                'title': variant.get('title'),
+                'sku': variant.get('sku') or None,
+                'option1': variant.get('option1'),
+                'option2': variant.get('option2'),
+                'option3': variant.get('option3'),
+                'available': _to_bool(variant.get('available')),
+                'price': _to_float(variant.get('price')),
+                'compare_at_price': _to_float(variant.get('compare_at_price')),
+                'grams': _to_int(variant.get('grams')),
+            })
+
+    return rows
+
+
+ROW_BUILDERS: Dict[str, Callable[[str, Iterable[Dict[str, Any]]], List[Dict[str, Any]]]] = {
+    'products': product_rows,
+    'variants': variant_rows,
+}
+
+
+class DrainBuffer(io.RawIOBase):
+    """Write-only sink whose contents are handed out and discarded after every chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class CatalogWriter:
+    """Base class for writers that receive catalog rows one chunk at a time"""
+
+    def __init__(self, sink, table: str):
+        self.sink = sink
+        self.table = table
+        self.columns = TABLE_COLUMNS[table]
+        self.rows_written = 0
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class CSVCatalogWriter(CatalogWriter):
+    """Plain CSV output with a header row; missing values are written as empty cells"""
+
+    def __init__(self, sink, table: str):
+        super().__init__(sink, table)
+        self._text = io.TextIOWrapper(sink, encoding='utf-8', newline='', write_through=True)
+        self._writer = csv.DictWriter(self._text, fieldnames=[name for name, _ in self.columns])
+        self._writer.writeheader()
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._text.flush()
+        self._text.detach()
+
+
+class _ArrowCatalogWriter(CatalogWriter):
+    """Shared schema handling for the pyarrow based writers"""
+
+    def __init__(self, sink, table: str):
+        super().__init__(sink, table)
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("pyarrow is required for parquet and arrow exports")
+
+        self._pa = pa
+        self.schema = pa.schema([(name, getattr(pa, ARROW_TYPES[logical_type])()) for name, logical_type in self.columns])
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        batch = self._pa.Table.from_pylist(rows, schema=self.schema)
+        self._writer.write_table(batch)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class ParquetCatalogWriter(_ArrowCatalogWriter):
+    """Parquet output, one row group per chunk"""
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.sink, self.schema, compression='snappy')
+
+
+class ArrowCatalogWriter(_ArrowCatalogWriter):
+    """Arrow IPC streaming format, one record batch per chunk"""
+
+    def _open_writer(self):
+        return self._pa.ipc.new_stream(self.sink, self.schema)
+
+
+WRITERS = {
+    'csv': CSVCatalogWriter,
+    'parquet': ParquetCatalogWriter,
+    'arrow': ArrowCatalogWriter,
+}
+
+
+def get_writer(export_format: str, sink, table: str) -> CatalogWriter:
+    """Create the writer for an export format and table"""
+    if export_format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unsupported export table: {table}")
+    return WRITERS[export_format](sink, table)
+
+
+def iter_db_catalogs(db: Session, website_urls: Optional[List[str]] = None) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Yield (website_url, products) for stored catalogs, one store at a time"""
+    query = db.query(Brand).filter(Brand.product_catalog.isnot(None))
+    if website_urls:
+        query = query.filter(Brand.website_url.in_([normalize_url(url) for url in website_urls]))
+
+    for brand in query.order_by(Brand.id).yield_per(1):
+        yield brand.website_url, brand.product_catalog
+
+
+async def iter_live_catalogs(scraper, website_urls: List[str]) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Yield (website_url, products) straight from the crawler, one /products.json page at a time"""
+    for website_url in website_urls:
+        website_url = normalize_url(website_url)
+
+        async for page in scraper._iter_product_pages(website_url):
+            yield website_url, page
+
+
+async def _as_async(catalogs):
+    """Allow sync and async catalog sources to be consumed the same way"""
+    if hasattr(catalogs, '__aiter__'):
+        async for item in catalogs:
+            yield item
+    else:
+        for item in catalogs:
+            yield item
+
+
+async def stream_export(catalogs, export_format: str, table: str,
+                        chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Encode catalogs into the requested format, yielding output bytes chunk by chunk"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    build_rows = ROW_BUILDERS[table]
+    sink = DrainBuffer()
+    writer = get_writer(export_format, sink, table)
+    pending: List[Dict[str, Any]] = []
+
+    async for website_url, products in _as_async(catalogs):
+        pending.extend(build_rows(website_url, products))
+
+        while len(pending) >= chunk_size:
+            writer.write_rows(pending[:chunk_size])
+            pending = pending[chunk_size:]
+            data = sink.drain()
+            if data:
+                yield data
+
+    writer.write_rows(pending)
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,191 @@
+import re
+from typing import Optional, Dict, Any
+from urllib.parse import unquote
+from app.core.config import settings
+from app.schemas.brand import ContactDetails
+from app.services.structured_data import StructuredData
+
+# Patterns are compiled once at import time and shared by every scrape
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(?<![\w+])\+?\(?\d[\d \t().-]{6,18}\d(?!\w)')
+DATE_PATTERN = re.compile(r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{4}')
+ADDRESS_PATTERN = re.compile(
+    r'\d+[^\n]{0,80}?\b(?:street|st|avenue|ave|road|rd|drive|dr|lane|ln|boulevard|blvd|floor|suite|sector|nagar|marg)\b[^\n]{0,120}',
+    re.IGNORECASE
+)
+REGION_CLASS_PATTERN = re.compile(r'footer|contact', re.IGNORECASE)
+PHONE_SEPARATORS = re.compile(r'[\s().-]')
+NON_DIGITS = re.compile(r'\D')
+
+# Addresses that are placeholders or belong to the platform rather than the store
+SKIPPED_EMAIL_MARKERS = ('example', 'test', 'noreply', 'no-reply', 'sentry', 'wixpress', 'shopify.com')
+SKIPPED_EMAIL_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg')
+
+
+def normalize_email(raw: str) -> Optional[str]:
+    """Lowercase an email and drop placeholders, platform addresses and image names like logo@2x.png"""
+    email = unquote(raw).strip().strip('.').lower()
+    match = EMAIL_PATTERN.fullmatch(email)
+    if not match:
+        return None
+    if email.endswith(SKIPPED_EMAIL_SUFFIXES) or any(marker in email for marker in SKIPPED_EMAIL_MARKERS):
+        return None
+    return email
+
+
+def normalize_phone(raw: str, strict: bool = True) -> Optional[str]:
+    """
+    Normalize a phone number to E.164
+
+    Args:
+        raw: Number as written on the page or in a tel: link
+        strict: Require visible phone formatting (a leading + or separators, at least
+            ten digits, not a date) so that SKUs, order numbers and dates are rejected
+
+    Returns:
+        The number as +<country code><number>, or None if it does not look like a phone
+    """
+    raw = unquote(raw).strip()
+    has_plus = raw.startswith('+')
+
+    digits = NON_DIGITS.sub('', raw)
+
+    if strict and not has_plus:
+        if not PHONE_SEPARATORS.search(raw) or len(digits) < 10 or DATE_PATTERN.search(raw):
+            return None
+
+    if has_plus:
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif digits.startswith('0') and settings.DEFAULT_PHONE_COUNTRY_CODE:
+        digits = settings.DEFAULT_PHONE_COUNTRY_CODE + digits[1:]
+    elif len(digits) <= 10 and settings.DEFAULT_PHONE_COUNTRY_CODE:
+        digits = settings.DEFAULT_PHONE_COUNTRY_CODE + digits
+
+    if not 8 <= len(digits) <= 15:
+        return None
+
+    return '+' + digits
+
+
+def _format_postal_address(address: Any) -> Optional[str]:
+    """Render a schema.org PostalAddress as a single line"""
+    if isinstance(address, str):
+        return address.strip() or None
+    if not isinstance(address, dict):
+        return None
+
+    parts = [
+        address.get(key) for key in
+        ('streetAddress', 'addressLocality', 'addressRegion', 'postalCode', 'addressCountry')
+    ]
+    parts = [part.get('name') if isinstance(part, dict) else part for part in parts]
+    line = ', '.join(str(part).strip() for part in parts if part)
+    return line or None
+
+
+class ContactExtractor:
+    """Collects normalized, deduplicated contact details from the candidate regions of a store's pages"""
+
+    def __init__(self, max_emails: int = 5, max_phones: int = 3):
+        self.max_emails = max_emails
+        self.max_phones = max_phones
+        # Dicts keep first-seen order while deduplicating
+        self.emails: Dict[str, None] = {}
+        self.phones: Dict[str, None] = {}
+        self.address: Optional[str] = None
+
+    def add_email(self, raw: str) -> None:
+        email = normalize_email(raw)
+        if email and len(self.emails) < self.max_emails:
+            self.emails.setdefault(email)
+
+    def add_phone(self, raw: str, strict: bool = True) -> None:
+        phone = normalize_phone(raw, strict)
+        if phone and len(self.phones) < self.max_phones:
+            self.phones.setdefault(phone)
+
+    def add_address(self, raw: Optional[str]) -> None:
+        if raw and not self.address:
+            self.address = ' '.join(raw.split())[:200]
+
+    def scan_text(self, text: str, find_address: bool = False) -> None:
+        """Run the precompiled patterns over a bounded block of text"""
+        for match in EMAIL_PATTERN.finditer(text):
+            self.add_email(match.group())
+        for match in PHONE_PATTERN.finditer(text):
+            self.add_phone(match.group())
+        if find_address and not self.address:
+            match = ADDRESS_PATTERN.search(text)
+            if match:
+                self.add_address(match.group())
+
+    def scan_links(self, soup) -> None:
+        """mailto: and tel: links are explicit contact data and skip the free-text heuristics"""
+        for link in soup.find_all('a', href=re.compile(r'^\s*(mailto|tel):', re.IGNORECASE)):
+            scheme, _, value = link['href'].strip().partition(':')
+            value = value.split('?', 1)[0]
+            if scheme.lower() == 'mailto':
+                for address in value.split(','):
+                    self.add_email(address)
+            else:
+                self.add_phone(value, strict=False)
+
+    def scan_organization(self, data: Dict[str, Any]) -> None:
+        """Read email, telephone and address from a JSON-LD Organization-like object"""
+        contact_points = data.get('contactPoint') or []
+        if isinstance(contact_points, dict):
+            contact_points = [contact_points]
+
+        for source in [data] + [point for point in contact_points if isinstance(point, dict)]:
+            if isinstance(source.get('email'), str):
+                self.add_email(source['email'])
+            if isinstance(source.get('telephone'), str):
+                self.add_phone(source['telephone'], strict=False)
+
+        self.add_address(_format_postal_address(data.get('address')))
+
+    def scan_structured_data(self, structured_data: StructuredData) -> None:
+        for organization in structured_data.organizations:
+            self.scan_organization(organization)
+
+    def scan_regions(self, soup) -> None:
+        """Scan only the footer, contact blocks and <address> elements instead of the whole page"""
+        regions = soup.find_all(['footer', 'address'])
+        regions += soup.find_all(['div', 'section'], class_=REGION_CLASS_PATTERN)
+        regions += soup.find_all(['div', 'section'], id=REGION_CLASS_PATTERN)
+
+        seen = set()
+        for region in regions:
+            # Nested matches are already covered by their outer region
+            if id(region) in seen or any(id(parent) in seen for parent in region.parents):
+                continue
+            seen.add(id(region))
+            self.scan_text(region.get_text('\n'), find_address=region.name == 'address')
+
+    def scan_homepage(self, soup, structured_data: StructuredData) -> None:
+        self.scan_structured_data(structured_data)
+        self.scan_links(soup)
+        self.scan_regions(soup)
+
+    def scan_contact_page(self, soup, structured_data: StructuredData) -> None:
+        """The contact page is itself a candidate region; navigation chrome is skipped"""
+        self.scan_structured_data(structured_data)
+        self.scan_links(soup)
+        body = soup.find('main') or soup.find(id='MainContent') or soup.body or soup
+        # Pages are cached per scrape, so chrome is skipped rather than decomposed
+        strings = (
+            string for string in body.find_all(string=True)
+            if string.parent.name not in ('script', 'style') and not string.find_parent(['nav', 'header'])
+        )
+        self.scan_text('\n'.join(strings), find_address=True)
+
+    def to_contact_details(self) -> Optional[ContactDetails]:
+        if not (self.emails or self.phones or self.address):
+            return None
+        return ContactDetails(
+            emails=list(self.emails) or None,
+            phone_numbers=list(self.phones) or None,
+            address=self.address
+        )
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -22,6 +23,36 @@ def get_db():
         db.close()
 
 def create_tables():
-    """Create all database tables"""
+    """Create all database tables and add columns missing from tables created by older versions"""
     from app.models.brand import Base
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    try:
+        Base.metadata.create_all(bind=engine)
+        migrate_tables(Base.metadata)
+    except OperationalError:
+        # Several workers starting at once race to create the same tables and columns
+        Base.metadata.create_all(bind=engine)
+        migrate_tables(Base.metadata)
+
+def migrate_tables(metadata):
+    """
+    Add model columns (and their indexes) that existing tables lack
+
+    create_all never alters a table that already exists. Added columns are nullable, so old rows
+    read as NULL; columns whose type changed need no migration since SQLite keeps any stored value
+    and the compressed column types still read the old uncompressed ones.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+                
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            missing = [column for column in table.columns if column.name not in existing]
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                
+            if missing:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Registry of insight extractors and the resources they read.
+
+Resources are loaded once per scrape: the homepage DOM, the product catalog, or the first
+matching page of a page type (privacy policy, FAQ, ...). Extractors declare the resources
+and other sections they need and each produce one section of BrandInsights. `run` resolves
+the declarations into a DAG and starts every node as soon as its dependencies are done.
+
+Plugins register on the module-level `extractors` registry before a scrape starts:
+
+    @extractors.extractor('newsletter', requires=('homepage',))
+    async def newsletter(scraper, website_url, homepage):
+        return homepage.soup.find('input', attrs={'name': 'contact[email]'}) is not None
+
+Sections that are not BrandInsights fields are stored in `additional_data`.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Iterable, NamedTuple, Tuple
+from app.schemas.brand import BrandInsights
+
+if TYPE_CHECKING:
+    from app.services.shopify_scraper import Page
+
+
+class Node(NamedTuple):
+    name: str
+    # Called as func(scraper, website_url, **dependencies)
+    func: Callable[..., Awaitable[Any]]
+    requires: Tuple[str, ...]
+    is_section: bool
+
+
+class ExtractorRegistry:
+    """Resources and section extractors, keyed by name; names double as keyword arguments"""
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+
+    def _register(self, name: str, requires: Iterable[str], is_section: bool):
+        if not name.isidentifier():
+            raise ValueError(f"{name!r} is not a valid resource or section name")
+
+        def decorator(func):
+            if name in self.nodes:
+                raise ValueError(f"{name!r} is already registered")
+            self.nodes[name] = Node(name, func, tuple(requires), is_section)
+            return func
+
+        return decorator
+
+    def resource(self, name: str, requires: Iterable[str] = ()):
+        """Register a resource loader; a loader that raises skips every extractor depending on it"""
+        return self._register(name, requires, is_section=False)
+
+    def extractor(self, section: str, requires: Iterable[str] = ()):
+        """Register a section extractor; one that raises yields None for its section"""
+        return self._register(section, requires, is_section=True)
+
+    def page_type(self, name: str, group: str, paths: Iterable[str], accept: Callable[['Page'], Any],
+                  prefetch: bool = False) -> None:
+        """
+        Register a resource resolving to the first candidate page that passes `accept`, or None
+
+        Candidates are probed in the order learned for the probe `group`; with `prefetch` they
+        are requested at once, after the first PROBE_SEQUENTIAL_CANDIDATES once that order is proven.
+        """
+        paths = list(paths)
+
+        async def find(scraper, website_url: str) -> Optional['Page']:
+            return await scraper._find_page(group, website_url, paths, accept, prefetch)
+
+        self.resource(name)(find)
+
+    @property
+    def sections(self) -> List[str]:
+        return [name for name, node in self.nodes.items() if node.is_section]
+
+    def plan(self, sections: Optional[Iterable[str]] = None) -> List[str]:
+        """Nodes needed for `sections` (default: all), dependencies first; unknown names and cycles raise ValueError"""
+        order: List[str] = []
+        visiting = set()
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError("Dependency cycle: " + " -> ".join(path + (name,)))
+            node = self.nodes.get(name)
+            if node is None:
+                raise ValueError(f"Unknown resource or section {name!r}" + (f" required by {path[-1]!r}" if path else ""))
+
+            visiting.add(name)
+            for dependency in node.requires:
+                visit(dependency, path + (name,))
+            visiting.discard(name)
+            order.append(name)
+
+        for section in (self.sections if sections is None else sections):
+            visit(section, ())
+        return order
+
+    async def run(self, scraper, website_url: str, sections: Optional[Iterable[str]] = None,
+                  run_node: Optional[Callable[[Awaitable[Any]], Awaitable[Any]]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run every node needed for `sections` concurrently and yield (section, value) as each completes
+
+        `run_node` wraps each node's coroutine, e.g. to bound it by a timeout. Nodes still
+        running when the consumer stops iterating are cancelled.
+        """
+        order = self.plan(sections)
+        loop = asyncio.get_running_loop()
+        futures = {name: loop.create_future() for name in order}
+        for future in futures.values():
+            # Failed resources nobody depends on must not log "exception was never retrieved"
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def run(node: Node) -> None:
+            future = futures[node.name]
+            try:
+                inputs = {dependency: await futures[dependency] for dependency in node.requires}
+                coroutine = node.func(scraper, website_url, **inputs)
+                value = await (run_node(coroutine) if run_node is not None else coroutine)
+            except Exception as e:
+                if node.is_section:
+                    future.set_result(None)
+                    results.put_nowait((node.name, None))
+                else:
+                    future.set_exception(e)
+                return
+
+            future.set_result(value)
+            if node.is_section:
+                results.put_nowait((node.name, value))
+
+        tasks = [asyncio.create_task(run(self.nodes[name])) for name in order]
+        try:
+            for _ in range(sum(self.nodes[name].is_section for name in order)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def apply_section(insights: BrandInsights, section: str, value: Any) -> None:
+    """Set a section on the insights; sections added by plugins go into `additional_data`"""
+    if section in BrandInsights.model_fields:
+        setattr(insights, section, value)
+    else:
+        if insights.additional_data is None:
+            insights.additional_data = {}
+        insights.additional_data[section] = value
+
+
+def section_value(insights: BrandInsights, section: str) -> Any:
+    """Inverse of apply_section"""
+    if section in BrandInsights.model_fields:
+        return getattr(insights, section)
+    return (insights.additional_data or {}).get(section)
+
+
+# Built-in extractors are registered by app.services.shopify_scraper
+extractors = ExtractorRegistry()
@@ -0,0 +1,193 @@
+import html
+import re
+from typing import TYPE_CHECKING, Optional, List, Iterable, Iterator, Set
+from app.core.config import settings
+from app.schemas.brand import FAQ
+from app.services.structured_data import StructuredData
+from app.services.text_extractor import SKIP_TAGS, iter_text, join_text, normalize_text
+
+if TYPE_CHECKING:
+    from bs4.element import Tag
+
+# Accordion triggers are usually buttons, so unlike main-text extraction they are read
+FAQ_SKIP_TAGS = SKIP_TAGS - {'button'}
+
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+QUESTION_TAGS = ['summary', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dt', 'button', 'strong', 'b']
+
+# Class tokens of common Shopify theme accordions (Dawn, Debut, Impulse, Prestige, FAQ apps), matched per token
+_WIDGET = r'(?:faq|faqs|accordion|collapsible|toggle)'
+ITEM_CLASS = re.compile(_WIDGET + r'[_-]+(?:item|row|entry|block)', re.IGNORECASE)
+QUESTION_CLASS = re.compile(
+    _WIDGET + r'[_-]+(?:question|title|trigger|header|heading|button|toggle|label)(?:[_-]+btn)?|(?:faq[_-]+)?question',
+    re.IGNORECASE
+)
+ANSWER_CLASS = re.compile(_WIDGET + r'[_-]+(?:answer|content|body|panel|text)|(?:faq[_-]+)?answer', re.IGNORECASE)
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def _has_class(node: 'Tag', pattern: re.Pattern) -> bool:
+    return any(pattern.fullmatch(token) for token in node.get('class') or ())
+
+
+def _is_widget(node: 'Tag') -> bool:
+    return node.name == 'details' or any(
+        _has_class(node, pattern) for pattern in (ITEM_CLASS, QUESTION_CLASS, ANSWER_CLASS)
+    )
+
+
+def _node_text(node, max_chars: int) -> str:
+    return join_text(_iter_node_text(node), max_chars)
+
+
+def _iter_node_text(node) -> Iterator[str]:
+    """Visible text of a tag, or of a bare string between tags"""
+    from bs4.element import NavigableString, PreformattedString, Tag
+
+    if isinstance(node, Tag):
+        if node.name not in FAQ_SKIP_TAGS:
+            yield from iter_text(node, FAQ_SKIP_TAGS)
+    elif isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+        text = normalize_text(node)
+        if text:
+            yield text
+
+
+def _iter_nodes_text(nodes: Iterable) -> Iterator[str]:
+    for node in nodes:
+        yield from _iter_node_text(node)
+
+
+def _following_answer(heading: 'Tag') -> Iterator:
+    """Siblings after a question heading, up to the next heading or accordion widget"""
+    for sibling in heading.next_siblings:
+        if getattr(sibling, 'name', None) is not None and (sibling.name in HEADING_TAGS or _is_widget(sibling)):
+            return
+        yield sibling
+
+
+def html_to_text(value: str) -> str:
+    """Plain text of an HTML fragment such as a JSON-LD answer, without building a DOM"""
+    return normalize_text(html.unescape(HTML_TAG_PATTERN.sub(' ', value)))
+
+
+class FAQCollector:
+    """Deduplicated, size-bounded list of question/answer pairs"""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit or settings.MAX_FAQS
+        self.faqs: List[FAQ] = []
+        self._seen: Set[str] = set()
+
+    @property
+    def full(self) -> bool:
+        return len(self.faqs) >= self.limit
+
+    def add(self, question: Optional[str], answer: Optional[str]) -> None:
+        if self.full or not question or not answer:
+            return
+        question = question[:settings.FAQ_MAX_QUESTION_CHARS].strip()
+        answer = answer[:settings.FAQ_MAX_ANSWER_CHARS].strip()
+        key = question.casefold()
+        if len(question) < 4 or not answer or key in self._seen:
+            return
+        self._seen.add(key)
+        self.faqs.append(FAQ(question=question, answer=answer))
+
+
+def collect_json_ld_faqs(structured_data: StructuredData, collector: FAQCollector) -> None:
+    """Add the question/answer pairs of FAQPage JSON-LD"""
+    for faq_page in structured_data.faq_pages:
+        questions = faq_page.get('mainEntity') or []
+        if isinstance(questions, dict):
+            questions = [questions]
+
+        for question in questions:
+            if collector.full:
+                return
+            if not isinstance(question, dict):
+                continue
+            answer = question.get('acceptedAnswer') or {}
+            if isinstance(answer, list):
+                answer = answer[0] if answer else {}
+
+            name = question.get('name')
+            text = answer.get('text') if isinstance(answer, dict) else None
+            if isinstance(name, str) and isinstance(text, str):
+                # Answers frequently embed HTML
+                collector.add(normalize_text(name), html_to_text(text))
+
+
+def collect_dom_faqs(root: 'Tag', collector: FAQCollector) -> None:
+    """
+    Find question/answer pairs in a single walk of the DOM
+
+    Recognizes <details>/<summary>, accordion items, question/answer elements paired in
+    document order (or through aria-controls) and headings ending in a question mark
+    followed by their answer. Matched subtrees are not descended into, and the walk stops
+    as soon as the collector is full.
+    """
+    from bs4.element import Tag
+
+    max_question = settings.FAQ_MAX_QUESTION_CHARS
+    max_answer = settings.FAQ_MAX_ANSWER_CHARS
+    # Question element waiting for its answer panel: (text, id of the panel it controls)
+    pending = None
+
+    stack = [iter(root.contents)]
+    while stack and not collector.full:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+        if not isinstance(node, Tag) or node.name in FAQ_SKIP_TAGS:
+            continue
+
+        if node.name == 'details':
+            summary = node.find('summary')
+            if summary is not None:
+                question = _node_text(summary, max_question)
+                answer_nodes = (child for child in node.contents if child is not summary)
+                collector.add(question, join_text(_iter_nodes_text(answer_nodes), max_answer))
+                continue
+
+        elif node.get('class'):
+            if _has_class(node, ITEM_CLASS):
+                question_node = node.find(QUESTION_TAGS)
+                if question_node is not None:
+                    question = _node_text(question_node, max_question)
+                    text = _node_text(node, len(question) + max_answer + 1)
+                    if text.startswith(question):
+                        collector.add(question, text[len(question):])
+                    continue
+
+            elif _has_class(node, QUESTION_CLASS):
+                pending = (_node_text(node, max_question), node.get('aria-controls'))
+                continue
+
+            elif _has_class(node, ANSWER_CLASS) and pending is not None and pending[1] in (None, node.get('id')):
+                collector.add(pending[0], _node_text(node, max_answer))
+                pending = None
+                continue
+
+        if node.name in HEADING_TAGS:
+            question = _node_text(node, max_question)
+            if question.endswith('?'):
+                collector.add(question, join_text(_iter_nodes_text(_following_answer(node)), max_answer))
+                continue
+
+        stack.append(iter(node.contents))
+
+
+def extract_faqs(soup, structured_data: Optional[StructuredData] = None, limit: Optional[int] = None) -> List[FAQ]:
+    """FAQPage JSON-LD entries first, completed from the page's markup up to `limit` questions"""
+    collector = FAQCollector(limit)
+
+    if structured_data is not None:
+        collect_json_ld_faqs(structured_data, collector)
+
+    if not collector.full:
+        collect_dom_faqs(soup.body or soup, collector)
+
+    return collector.faqs
@@ -0,0 +1,251 @@
+import codecs
+import json
+from typing import TYPE_CHECKING, Optional, List, Any, Iterable, Iterator, Mapping
+from urllib.parse import urlparse
+from app.core import json_codec
+from app.core.config import settings
+from app.core.metrics import transfer_metrics
+
+if TYPE_CHECKING:
+    import requests
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+# Characters that may continue a JSON number ("1" -> "12", "1." -> "1.5", "1e" -> "1e3")
+NUMBER_CHARS = '0123456789.eE+-'
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the limit for its resource type"""
+
+    def __init__(self, url: str, limit: int):
+        super().__init__(f"Response from {url} exceeds the {limit} byte limit")
+
+
+class DecompressionLimitExceeded(ResponseTooLarge):
+    """Raised when a content-encoded body expands far beyond its size on the wire"""
+
+    def __init__(self, url: str, ratio: int):
+        Exception.__init__(self, f"Response from {url} expands more than {ratio}x when decoded")
+
+
+class FetchedResponse:
+    """Status, headers and a size-bounded body of a completed GET"""
+
+    def __init__(self, url: str, status_code: int, headers: Mapping[str, str], content: bytes = b'',
+                 items: Optional[List[Any]] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        # Array elements decoded incrementally when the body was streamed as JSON items
+        self.items = items
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200
+
+    def json(self) -> Any:
+        return json_codec.loads(self.content)
+
+
+def create_session(pool_size: Optional[int] = None) -> 'requests.Session':
+    """HTTP session with the scraper's default headers and a connection pool of `pool_size` per host"""
+    # Imported here so importing the app does not pay for requests/urllib3 until a session is needed
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    pool_size = pool_size or settings.HTTP_POOL_SIZE
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': settings.USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        # Every coding urllib3 can decode here: br and zstd join gzip/deflate when brotli/zstandard are installed
+        'Accept-Encoding': ', '.join(ACCEPT_ENCODING.split(',')),
+        'Connection': 'keep-alive',
+    })
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def body_limit(resource: str) -> int:
+    return settings.MAX_BODY_BYTES.get(resource, settings.MAX_BODY_BYTES['html'])
+
+
+class LimitedBody:
+    """
+    Streamed body of a requests response, aborted as soon as it grows past `limit` decoded
+    bytes or expands more than MAX_DECOMPRESSION_RATIO times its size on the wire
+    """
+
+    def __init__(self, response, url: str, limit: int, deadline=None):
+        self.response = response
+        self.url = url
+        self.limit = limit
+        self.deadline = deadline
+        self.decoded_bytes = 0
+
+    @property
+    def wire_bytes(self) -> int:
+        """Bytes read from the connection so far, before content decoding"""
+        try:
+            return self.response.raw.tell()
+        except AttributeError:
+            return self.decoded_bytes
+
+    def __iter__(self) -> Iterator[bytes]:
+        declared = self.response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > self.limit:
+            raise ResponseTooLarge(self.url, self.limit)
+
+        max_ratio = settings.MAX_DECOMPRESSION_RATIO
+        for chunk in self.response.iter_content(CHUNK_SIZE):
+            self.decoded_bytes += len(chunk)
+            if self.decoded_bytes > self.limit:
+                raise ResponseTooLarge(self.url, self.limit)
+            if self.decoded_bytes >= settings.DECOMPRESSION_CHECK_BYTES and self.decoded_bytes > max_ratio * self.wire_bytes:
+                raise DecompressionLimitExceeded(self.url, max_ratio)
+            if self.deadline is not None:
+                self.deadline.check()
+            yield chunk
+
+    def read(self) -> bytes:
+        return b''.join(self)
+
+
+def _decoded_whole(buffer: str, end: int, exhausted: bool) -> bool:
+    """Whether a value decoded up to `end` cannot continue in the next chunk"""
+    return exhausted or (end < len(buffer) and buffer[end] not in NUMBER_CHARS)
+
+
+def iter_json_array_items(chunks: Iterable[bytes], key: str, max_item_bytes: int) -> Iterator[Any]:
+    """
+    Decode the elements of the top-level `key` array of a JSON document as they arrive
+
+    Only the element currently being received is buffered, so a /products.json page
+    never has to be held in memory as raw text and as parsed objects at the same time.
+    Members of the top-level object before the array are decoded and skipped, so an array
+    of the same name nested deeper is never matched.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = 0
+    # Next token of the top-level object: '{', 'key', ':', 'value' or ','
+    expect = '{'
+    member = None
+    in_array = False
+    chunks = iter(chunks)
+    exhausted = False
+
+    while True:
+        if not in_array:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+
+            if position < len(buffer):
+                char = buffer[position]
+                try:
+                    if expect == 'value' and member == key and char == '[':
+                        in_array = True
+                        position += 1
+                    elif expect in ('key', 'value'):
+                        if expect == 'key' and char == '}':
+                            return
+                        value, end = decoder.raw_decode(buffer, position)
+                        if not _decoded_whole(buffer, end, exhausted):
+                            # A number at the end of the buffer may continue in the next chunk
+                            raise ValueError("incomplete value")
+                        if expect == 'key':
+                            member, expect = value, ':'
+                        else:
+                            expect = ','
+                        position = end
+                    elif char == expect:
+                        position += 1
+                        expect = 'key' if expect in ('{', ',') else 'value'
+                    else:
+                        # Not an object, end of the object, or malformed: there is no such array
+                        return
+                    continue
+                except ValueError:
+                    # Incomplete member: drop what has been consumed and wait for more data
+                    if exhausted:
+                        return
+                    buffer = buffer[position:]
+                    position = 0
+                    if len(buffer) > max_item_bytes:
+                        return
+        else:
+            while position < len(buffer) and buffer[position] in WHITESPACE + ',':
+                position += 1
+
+            if position < len(buffer):
+                if buffer[position] == ']':
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                    if not _decoded_whole(buffer, end, exhausted):
+                        raise ValueError("incomplete element")
+                    position = end
+                    yield item
+                    continue
+                except ValueError:
+                    # Incomplete element: drop what has been consumed and wait for more data
+                    if exhausted:
+                        raise
+                    buffer = buffer[position:]
+                    position = 0
+                    if len(buffer) > max_item_bytes:
+                        raise ValueError(f"JSON element in '{key}' exceeds {max_item_bytes} bytes")
+
+        if exhausted:
+            return
+
+        try:
+            buffer += text_decoder.decode(next(chunks))
+        except StopIteration:
+            buffer += text_decoder.decode(b'', final=True)
+            exhausted = True
+
+
+def fetch_bounded(session, url: str, resource: str = 'html', items_key: Optional[str] = None,
+                  deadline=None, **kwargs) -> FetchedResponse:
+    """
+    Blocking GET with a streamed, size-bounded body
+
+    Args:
+        session: requests.Session to send the request with
+        url: URL to fetch
+        resource: Resource type selecting the body limit from MAX_BODY_BYTES
+        items_key: Decode this top-level JSON array incrementally instead of keeping the body
+        deadline: Optional Deadline checked between body chunks
+    """
+    response = session.get(url, stream=True, **kwargs)
+    body = LimitedBody(response, url, body_limit(resource), deadline)
+    rejected = False
+
+    try:
+        if response.status_code != 200:
+            # Error bodies are only needed for their status; read a bounded prefix at most
+            return FetchedResponse(url, response.status_code, response.headers, body.read())
+
+        if items_key:
+            items = list(iter_json_array_items(body, items_key, settings.MAX_JSON_ITEM_BYTES))
+            return FetchedResponse(url, response.status_code, response.headers, items=items)
+
+        return FetchedResponse(url, response.status_code, response.headers, body.read())
+
+    except ResponseTooLarge:
+        rejected = True
+        raise
+
+    finally:
+        transfer_metrics.record(urlparse(url).netloc, response.headers.get('Content-Encoding', 'identity').lower(),
+                                body.wire_bytes, body.decoded_bytes, rejected)
+        response.close()
@@ -0,0 +1,151 @@
+import re
+from typing import Optional, Dict, Iterable, NamedTuple, Tuple
+from urllib.parse import urljoin, urlparse, parse_qs
+
+# Profile hosts per SocialHandles field; subdomains such as www., m. and mobile. match too
+SOCIAL_DOMAINS = {
+    'instagram.com': 'instagram',
+    'facebook.com': 'facebook',
+    'fb.com': 'facebook',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'tiktok.com': 'tiktok',
+    'youtube.com': 'youtube',
+    'linkedin.com': 'linkedin',
+}
+SOCIAL_PLATFORMS = tuple(dict.fromkeys(SOCIAL_DOMAINS.values()))
+
+# ImportantLinks fields and their keywords, in priority order: a link matching several goes to the first
+IMPORTANT_LINK_KEYWORDS = (
+    ('order_tracking', ('track', 'order', 'tracking')),
+    ('contact_us', ('contact', 'support')),
+    ('blogs', ('blog', 'news', 'article')),
+    ('about_us', ('about', 'story')),
+    ('shipping_info', ('shipping', 'delivery')),
+)
+IMPORTANT_LINK_FIELDS = tuple(field for field, _ in IMPORTANT_LINK_KEYWORDS)
+_PRIORITY = {field: index for index, field in enumerate(IMPORTANT_LINK_FIELDS)}
+
+# Every pattern is compiled once: one alternation over the social hosts, one over all link keywords
+_SOCIAL_DOMAIN_ALTERNATION = '|'.join(re.escape(domain) for domain in sorted(SOCIAL_DOMAINS, key=len, reverse=True))
+SOCIAL_HOST_PATTERN = re.compile(r'(?:^|\.)(%s)$' % _SOCIAL_DOMAIN_ALTERNATION)
+# The same hosts matched on a raw href, so links to the store itself never pay for URL parsing
+SOCIAL_HREF_PATTERN = re.compile(
+    r'(?:https?:)?//(?:[^/?#@]*\.)?(?:%s)(?::\d+)?(?:[/?#]|$)' % _SOCIAL_DOMAIN_ALTERNATION, re.IGNORECASE
+)
+IMPORTANT_LINK_PATTERN = re.compile(
+    '|'.join(
+        '(?P<%s>%s)' % (field, '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)))
+        for field, keywords in IMPORTANT_LINK_KEYWORDS
+    ),
+    re.IGNORECASE
+)
+
+# Profile handle in the URL path, per platform
+PROFILE_PATTERNS = {
+    'instagram': re.compile(r'/([A-Za-z0-9_.]{1,30})(?:/|$)'),
+    'facebook': re.compile(r'/(?:pg/|pages/[^/]+/)?([A-Za-z0-9.\-]{2,80})(?:/|$)'),
+    'twitter': re.compile(r'/@?([A-Za-z0-9_]{1,15})(?:/|$)'),
+    'tiktok': re.compile(r'/@([A-Za-z0-9_.]{2,24})(?:/|$)'),
+    'youtube': re.compile(r'/(?:@([A-Za-z0-9_.\-]{3,30})|(?:c|user|channel)/([A-Za-z0-9_\-]+))(?:/|$)'),
+    'linkedin': re.compile(r'/(?:company|in|school|showcase)/([A-Za-z0-9_\-%.]+)(?:/|$)'),
+}
+
+# First path segments that are share widgets, posts or site sections rather than profiles
+RESERVED_SEGMENTS = {
+    'instagram': frozenset({'p', 'reel', 'reels', 'explore', 'stories', 'accounts', 'tv', 'about', 'developer'}),
+    'facebook': frozenset({'sharer', 'sharer.php', 'share', 'share.php', 'dialog', 'plugins', 'tr', 'login',
+                           'groups', 'events', 'watch', 'hashtag', 'profile.php', 'photo.php', 'story.php'}),
+    'twitter': frozenset({'intent', 'share', 'home', 'hashtag', 'search', 'i', 'login', 'explore', 'settings'}),
+    'tiktok': frozenset(),
+    'youtube': frozenset(),
+    'linkedin': frozenset(),
+}
+
+SKIPPED_SCHEMES = re.compile(r'(?:mailto|tel|sms|javascript|data):', re.IGNORECASE)
+
+
+class SocialProfile(NamedTuple):
+    platform: str
+    url: str
+    handle: str
+
+
+def social_profile(url: str) -> Optional[SocialProfile]:
+    """Platform and handle of a social profile URL; share links, posts and other hosts give None"""
+    parsed = urlparse(url if '//' in url else '//' + url)
+    match = SOCIAL_HOST_PATTERN.search((parsed.hostname or '').lower())
+    if not match:
+        return None
+
+    platform = SOCIAL_DOMAINS[match.group(1)]
+    if platform == 'facebook' and parsed.path.rstrip('/') == '/profile.php':
+        ids = parse_qs(parsed.query).get('id')
+        return SocialProfile(platform, url, ids[0]) if ids else None
+
+    handle_match = PROFILE_PATTERNS[platform].match(parsed.path)
+    if not handle_match:
+        return None
+    handle = next(group for group in handle_match.groups() if group)
+    if handle.lower() in RESERVED_SEGMENTS[platform]:
+        return None
+    return SocialProfile(platform, url, handle)
+
+
+def classify_link(href: str, text: str = '') -> Optional[str]:
+    """ImportantLinks field a link belongs to, judged by keywords in its URL and anchor text"""
+    best = None
+    for match in IMPORTANT_LINK_PATTERN.finditer(href + ' ' + text):
+        priority = _PRIORITY[match.lastgroup]
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    return IMPORTANT_LINK_FIELDS[best] if best is not None else None
+
+
+class PageLinks:
+    """First important link per ImportantLinks field and first profile per social platform on a page"""
+
+    def __init__(self):
+        self.important: Dict[str, str] = {}
+        self.social: Dict[str, SocialProfile] = {}
+
+    @property
+    def complete(self) -> bool:
+        return len(self.important) == len(IMPORTANT_LINK_FIELDS) and len(self.social) == len(SOCIAL_PLATFORMS)
+
+    def add(self, href: str, text: str, base_url: str) -> None:
+        href = href.strip()
+        if not href or href[0] == '#' or SKIPPED_SCHEMES.match(href):
+            return
+
+        if SOCIAL_HREF_PATTERN.match(href):
+            # Social hosts never count as store pages, even when they are not profiles (share buttons)
+            profile = social_profile(urljoin(base_url, href))
+            if profile is not None:
+                self.social.setdefault(profile.platform, profile)
+            return
+
+        field = classify_link(href, text)
+        if field is not None and field not in self.important:
+            self.important[field] = urljoin(base_url, href)
+
+
+def classify_anchors(anchors: Iterable[Tuple[str, str]], base_url: str) -> PageLinks:
+    """Classify (href, text) pairs in one pass, stopping once every field and platform is filled"""
+    links = PageLinks()
+    for href, text in anchors:
+        links.add(href, text, base_url)
+        if links.complete:
+            break
+    return links
+
+
+def classify_links(soup, base_url: str) -> PageLinks:
+    """Classify every <a href> of a parsed page"""
+    # find_all('a') plus an attribute check is several times cheaper than bs4's href=True filter
+    return classify_anchors(
+        ((anchor.attrs['href'], anchor.get_text(' ', strip=True)) for anchor in soup.find_all('a') if 'href' in anchor.attrs),
+        base_url
+    )
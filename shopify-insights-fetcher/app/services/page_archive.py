@@ -0,0 +1,138 @@
+"""
+Content-addressed archive of raw fetched responses, for re-running extractors offline.
+
+Layout under the archive root:
+
+    objects/ab/cdef....zz    zlib-compressed bodies named by the sha256 of the uncompressed body
+    stores/<host>.ndjson     one WARC-like record per response: URL, query parameters, status,
+                             headers, body digest and fetch time (later records win on replay)
+
+Identical bodies (shared theme assets, unchanged pages across re-scrapes) are stored once.
+Streamed /products.json pages are archived as {"<key>": [items]}, re-encoded from the decoded items.
+"""
+import hashlib
+import os
+import re
+import threading
+import zlib
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Mapping
+from urllib.parse import urlencode, urlparse
+from app.core import json_codec
+from app.core.config import settings
+from app.core.urls import normalize_url
+from app.services.fetching import FetchedResponse, iter_json_array_items
+
+UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9.-]')
+
+
+def request_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Canonical URL plus its query parameters in a canonical order"""
+    # Homepages recorded as "https://host" and fetched as "https://host/" are the same request
+    url = normalize_url(url)
+    if not params:
+        return url
+    return url + ('&' if '?' in url else '?') + urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+
+
+class PageArchive:
+    """Append-only response archive; recording is thread-safe, replay reads each store's index once"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Requests replayed without a matching record, i.e. pages a live scrape would have fetched
+        self.misses: List[str] = []
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'stores'), exist_ok=True)
+
+    def _index_path(self, host: str) -> str:
+        return os.path.join(self.root, 'stores', UNSAFE_FILENAME_CHARS.sub('_', host) + '.ndjson')
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:] + '.zz')
+
+    def put_body(self, body: bytes) -> str:
+        """Store a body under its sha256 unless it is already archived; returns the digest"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial object
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, 'wb') as handle:
+                handle.write(zlib.compress(body, settings.ARCHIVE_COMPRESSION_LEVEL))
+            os.replace(temporary, path)
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        with open(self._object_path(digest), 'rb') as handle:
+            return zlib.decompress(handle.read())
+
+    def record(self, url: str, params: Optional[Mapping[str, Any]], response: FetchedResponse,
+               resource: str = 'html', items_key: Optional[str] = None) -> None:
+        """Archive one fetched response (blocking)"""
+        body = response.content
+        if items_key and response.items is not None:
+            body = json_codec.dumps({items_key: response.items})
+
+        entry = {
+            'url': url,
+            'params': dict(params) if params else None,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'sha256': self.put_body(body),
+            'length': len(body),
+            'resource': resource,
+            'fetched_at': datetime.utcnow().isoformat(),
+        }
+        line = json_codec.dumps(entry) + b'\n'
+        with self._lock:
+            # A single appended write per record keeps lines whole when several workers share the archive
+            with open(self._index_path(urlparse(url).netloc), 'ab') as handle:
+                handle.write(line)
+
+    def _index(self, host: str) -> Dict[str, Dict[str, Any]]:
+        index = self._indexes.get(host)
+        if index is None:
+            index = {}
+            path = self._index_path(host)
+            if os.path.exists(path):
+                with open(path, 'rb') as handle:
+                    for line in handle:
+                        if line.strip():
+                            entry = json_codec.loads(line)
+                            index[request_key(entry['url'], entry.get('params'))] = entry
+            self._indexes[host] = index
+        return index
+
+    def replay(self, url: str, params: Optional[Mapping[str, Any]] = None,
+               items_key: Optional[str] = None) -> FetchedResponse:
+        """The archived response for a request, or a 404 when it was never archived"""
+        from requests.structures import CaseInsensitiveDict
+
+        entry = self._index(urlparse(url).netloc).get(request_key(url, params))
+        if entry is None:
+            self.misses.append(request_key(url, params))
+            return FetchedResponse(url, 404, CaseInsensitiveDict())
+
+        headers = CaseInsensitiveDict(entry['headers'])
+        body = self.get_body(entry['sha256'])
+        if items_key and entry['status'] == 200:
+            items = list(iter_json_array_items([body], items_key, settings.MAX_JSON_ITEM_BYTES))
+            return FetchedResponse(url, entry['status'], headers, items=items)
+        return FetchedResponse(url, entry['status'], headers, body)
+
+    def stores(self) -> List[str]:
+        """Canonical store URLs (scheme and host), as scrapes are started with, with an index in the archive"""
+        urls = []
+        for name in sorted(os.listdir(os.path.join(self.root, 'stores'))):
+            if not name.endswith('.ndjson'):
+                continue
+            with open(os.path.join(self.root, 'stores', name), 'rb') as handle:
+                first = handle.readline()
+            if first.strip():
+                parsed = urlparse(json_codec.loads(first)['url'])
+                urls.append(normalize_url(f"{parsed.scheme}://{parsed.netloc}"))
+        return urls
@@ -0,0 +1,99 @@
+"""
+Negative cache of candidate pages and learned probe order.
+
+Stages that probe a list of candidate paths (policies, FAQ, about, contact) skip paths that
+answered 404/410 for the same store within NEGATIVE_CACHE_TTL, and try the remaining ones
+in order of how often each path yielded content across every store scraped so far.
+"""
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Iterable, Set, Tuple
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from app.core.config import settings
+from app.models.brand import MissingPath, ProbeStat
+from app.services.database import SessionLocal
+
+MISSING_STATUSES = (404, 410)
+
+
+class ProbePlan:
+    """Known-missing paths of one store and path statistics, consulted and updated during a scrape"""
+
+    def __init__(self, store: str, missing: Iterable[str] = (), stats: Optional[Dict[Tuple[str, str], Tuple[int, int]]] = None):
+        self.store = store
+        self.missing: Set[str] = set(missing)
+        # (probe group, path) -> (hits, misses) across all stores
+        self.stats = stats or {}
+        # Outcomes of this scrape: (probe group, path) -> (status code, content used)
+        self.outcomes: Dict[Tuple[str, str], Tuple[int, bool]] = {}
+
+    def order(self, group: str, paths: Iterable[str]) -> List[str]:
+        """Candidates not known to be missing, most successful first; unseen paths keep their listed order"""
+        def success_rate(path: str) -> float:
+            hits, misses = self.stats.get((group, path), (0, 0))
+            return (hits + 1) / (hits + misses + 2)
+
+        # sorted() is stable, so ties keep the hand-written priority
+        return sorted((path for path in paths if path not in self.missing), key=success_rate, reverse=True)
+
+    def proven(self, group: str, path: str) -> bool:
+        """Whether `path` has yielded content for `group` on any store"""
+        return self.stats.get((group, path), (0, 0))[0] > 0
+
+    def record(self, group: str, path: str, status_code: int, used: bool) -> None:
+        self.outcomes[(group, path)] = (status_code, used)
+        if status_code in MISSING_STATUSES:
+            self.missing.add(path)
+
+
+class ProbeCache:
+    """Loads a ProbePlan before a scrape and persists its outcomes afterwards (blocking; run in a worker thread)"""
+
+    def __init__(self, session_factory=SessionLocal, ttl: Optional[float] = None):
+        self.session_factory = session_factory
+        self.ttl = settings.NEGATIVE_CACHE_TTL if ttl is None else ttl
+
+    def load(self, store: str) -> ProbePlan:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            missing = [
+                path for (path,) in
+                db.query(MissingPath.path).filter(MissingPath.store == store, MissingPath.expires_at > now)
+            ]
+            stats = {(row.probe_group, row.path): (row.hits, row.misses) for row in db.query(ProbeStat)}
+        return ProbePlan(store, missing, stats)
+
+    def save(self, plan: ProbePlan) -> None:
+        if not plan.outcomes:
+            return
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        with self.session_factory() as db:
+            for (group, path), (status_code, used) in plan.outcomes.items():
+                if status_code in MISSING_STATUSES:
+                    statement = insert(MissingPath).values(
+                        store=plan.store, path=path, status_code=status_code, checked_at=now, expires_at=expires_at
+                    )
+                    db.execute(statement.on_conflict_do_update(
+                        index_elements=['store', 'path'],
+                        set_={'status_code': status_code, 'checked_at': now, 'expires_at': expires_at}
+                    ))
+                else:
+                    db.execute(delete(MissingPath).where(MissingPath.store == plan.store, MissingPath.path == path))
+
+                # Counters are incremented in SQL so concurrent workers do not overwrite each other
+                statement = insert(ProbeStat).values(
+                    probe_group=group, path=path, hits=int(used), misses=int(not used), updated_at=now
+                )
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=['probe_group', 'path'],
+                    set_={
+                        'hits': ProbeStat.hits + statement.excluded.hits,
+                        'misses': ProbeStat.misses + statement.excluded.misses,
+                        'updated_at': now,
+                    }
+                ))
+
+            db.execute(delete(MissingPath).where(MissingPath.expires_at <= now))
+            db.commit()
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+from urllib.parse import urljoin
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.urls import normalize_url
+from app.models.brand import RefreshSchedule
+from app.schemas.brand import BrandInsights, ProductInfo
+from app.services.brand_service import TEXT_FIELDS, BrandService
+from app.services.database import SessionLocal
+from app.services.extractor_registry import apply_section
+from app.services.fetching import FetchedResponse
+from app.services.shopify_scraper import ShopifyScraper
+
+logger = logging.getLogger(__name__)
+
+# Sections are refreshed independently: the catalog moves much faster than policies and about pages
+SECTIONS = ("catalog", "content")
+
+# Sections read from the store's pages; refreshed without crawling the catalog
+CONTENT_FIELDS = (
+    "brand_name", "privacy_policy", "return_refund_policy", "faqs", "social_handles", "contact_details",
+    "brand_context", "important_links",
+)
+
+# Sections derived from the catalog; re-extracted when a catalog refresh finds changes
+CATALOG_FIELDS = ("collections", "product_collections", "hero_products")
+
+
+def _fingerprint(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def catalog_fingerprints(products: Optional[List[Dict[str, Any]]]) -> Dict[str, str]:
+    """Map product id -> hash of the product so two catalogs can be diffed"""
+    return {str(product.get("id")): _fingerprint(product) for product in products or []}
+
+
+def catalog_delta(old: Dict[str, str], new: Dict[str, str]) -> int:
+    """Number of products added, removed or changed between two catalogs"""
+    return len(old.keys() ^ new.keys()) + sum(1 for key in old.keys() & new.keys() if old[key] != new[key])
+
+
+def next_interval(interval: float, changed: bool) -> float:
+    """Halve the interval of stores that changed, back off on stores that did not"""
+    if changed:
+        interval *= settings.REFRESH_SPEEDUP_FACTOR
+    else:
+        interval *= settings.REFRESH_BACKOFF_FACTOR
+    return max(settings.REFRESH_MIN_INTERVAL, min(settings.REFRESH_MAX_INTERVAL, interval))
+
+
+class RefreshScheduler:
+    """In-process scheduler that re-scrapes watched stores with adaptive, per-section intervals"""
+
+    def __init__(self, session_factory=SessionLocal, concurrency: Optional[int] = None, scraper_factory=ShopifyScraper):
+        self.session_factory = session_factory
+        self.scraper_factory = scraper_factory
+        self.concurrency = concurrency or settings.REFRESH_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    def watch(db: Session, website_url: str) -> List[RefreshSchedule]:
+        """Schedule every section of a store, starting from its last scrape time"""
+        website_url = normalize_url(website_url)
+        brand = BrandService.get_brand_by_url(db, website_url)
+        now = datetime.utcnow()
+        schedules = []
+
+        for section in SECTIONS:
+            schedule = db.query(RefreshSchedule).filter(
+                RefreshSchedule.website_url == website_url,
+                RefreshSchedule.section == section
+            ).first()
+
+            if schedule is None:
+                interval = settings.REFRESH_INITIAL_INTERVALS[section]
+                last_run = brand.scraped_at if brand and brand.scraped_at else None
+                schedule = RefreshSchedule(
+                    website_url=website_url,
+                    section=section,
+                    interval_seconds=interval,
+                    last_run_at=last_run,
+                    next_run_at=last_run + timedelta(seconds=interval) if last_run else now,
+                    run_count=0,
+                    change_count=0
+                )
+                db.add(schedule)
+
+            schedule.is_active = True
+            schedules.append(schedule)
+
+        db.commit()
+        return schedules
+
+    @staticmethod
+    def unwatch(db: Session, website_url: str) -> bool:
+        updated = db.query(RefreshSchedule).filter(RefreshSchedule.website_url == normalize_url(website_url)).update({"is_active": False})
+        db.commit()
+        return updated > 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, *self._running.values(), return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                for schedule_id in self._due_schedule_ids():
+                    task = asyncio.create_task(self.refresh(schedule_id))
+                    self._running[schedule_id] = task
+                    task.add_done_callback(lambda _, key=schedule_id: self._running.pop(key, None))
+            except Exception as e:
+                logger.error(f"Refresh scheduler error: {str(e)}")
+
+            await asyncio.sleep(settings.REFRESH_POLL_INTERVAL)
+
+    def _due_schedule_ids(self) -> List[int]:
+        """
+        Claim due schedules that are not already running, bounded by the free concurrency slots
+
+        Each schedule is claimed with a conditional update of its next_run_at, so when several
+        workers run the scheduler against the same database only one of them refreshes it.
+        """
+        free_slots = self.concurrency - len(self._running)
+        if free_slots <= 0:
+            return []
+
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            query = db.query(RefreshSchedule.id, RefreshSchedule.next_run_at).filter(
+                RefreshSchedule.is_active.is_(True),
+                RefreshSchedule.next_run_at <= now
+            )
+            if self._running:
+                query = query.filter(RefreshSchedule.id.notin_(list(self._running)))
+
+            claimed = []
+            for row in query.order_by(RefreshSchedule.next_run_at).limit(free_slots).all():
+                # A claim that is never completed makes the schedule due again after the claim timeout
+                updated = db.query(RefreshSchedule).filter(
+                    RefreshSchedule.id == row.id,
+                    RefreshSchedule.next_run_at == row.next_run_at
+                ).update(
+                    {"next_run_at": now + timedelta(seconds=settings.REFRESH_CLAIM_TIMEOUT)},
+                    synchronize_session=False
+                )
+                db.commit()
+                if updated:
+                    claimed.append(row.id)
+            return claimed
+        finally:
+            db.close()
+
+    async def refresh(self, schedule_id: int) -> None:
+        """Refresh one section of one store and adapt its interval to whether it changed"""
+        async with self._semaphore:
+            db = self.session_factory()
+            try:
+                schedule = db.query(RefreshSchedule).filter(RefreshSchedule.id == schedule_id).first()
+                if schedule is None:
+                    return
+
+                try:
+                    if schedule.section == "catalog":
+                        changed = await self._refresh_catalog(db, schedule)
+                    else:
+                        changed = await self._refresh_content(db, schedule)
+                    schedule.last_error = None
+                except Exception as e:
+                    # Errors back off like an unchanged store instead of hammering a broken host
+                    logger.warning(f"Refresh of {schedule.website_url} ({schedule.section}) failed: {str(e)}")
+                    schedule.last_error = str(e)
+                    changed = False
+
+                now = datetime.utcnow()
+                schedule.run_count = (schedule.run_count or 0) + 1
+                if changed:
+                    schedule.change_count = (schedule.change_count or 0) + 1
+                    schedule.last_changed_at = now
+                schedule.interval_seconds = next_interval(schedule.interval_seconds, changed)
+                schedule.last_run_at = now
+                schedule.next_run_at = now + timedelta(seconds=schedule.interval_seconds)
+                db.commit()
+
+            finally:
+                db.close()
+
+    async def _first_catalog_page(self, scraper: ShopifyScraper, schedule: RefreshSchedule) -> FetchedResponse:
+        """Conditional request for the first /products.json page, decoded so the crawl can start from it"""
+        headers = {"If-None-Match": schedule.etag} if schedule.etag else {}
+        return await scraper._fetch(
+            urljoin(schedule.website_url, "/products.json"),
+            resource="products",
+            items_key="products",
+            params={"limit": settings.PRODUCTS_PAGE_LIMIT, "page": 1},
+            headers=headers
+        )
+
+    async def _refresh_catalog(self, db: Session, schedule: RefreshSchedule) -> bool:
+        scraper = self.scraper_factory()
+        first_page = await self._first_catalog_page(scraper, schedule)
+
+        # A matching ETag on page one (304) is a cheap signal; without one the full catalog is diffed
+        if first_page.status_code != 200:
+            return False
+
+        products = await scraper._get_product_catalog(schedule.website_url, first_page.items or [])
+        if products is None:
+            return False
+
+        new_hash = _fingerprint(sorted(catalog_fingerprints([product.dict() for product in products]).values()))
+
+        schedule.etag = first_page.headers.get("ETag") or schedule.etag
+        if new_hash == schedule.content_hash:
+            return False
+
+        # Collections and hero products follow the catalog; products found only through collections join it
+        derived = await self._catalog_sections(scraper, schedule.website_url, products)
+        new_catalog = [product.dict() for product in products + scraper._extra_products]
+        new_fingerprints = catalog_fingerprints(new_catalog)
+
+        brand = BrandService.get_brand_by_url(db, schedule.website_url)
+        if brand is not None:
+            schedule.last_delta = catalog_delta(catalog_fingerprints(brand.product_catalog), new_fingerprints)
+            brand.product_catalog = new_catalog
+            BrandService.update_sections(db, brand, derived, CATALOG_FIELDS)
+            brand.scraped_at = datetime.utcnow()
+        else:
+            schedule.last_delta = len(new_fingerprints)
+
+        # The first run only establishes a baseline for stores without a stored catalog hash
+        changed = schedule.content_hash is not None or (brand is not None and schedule.last_delta > 0)
+        schedule.content_hash = new_hash
+        return changed
+
+    @staticmethod
+    async def _catalog_sections(scraper: ShopifyScraper, website_url: str, products: List[ProductInfo]) -> BrandInsights:
+        """Re-extract CATALOG_FIELDS from a freshly crawled catalog without crawling it again"""
+        insights = BrandInsights(website_url=website_url)
+        insights.collections = await scraper._get_collections(website_url, products)
+        insights.product_collections = scraper._index_collections(insights.collections)
+        try:
+            homepage = await scraper._get_homepage(website_url)
+            insights.hero_products = await scraper._get_hero_products(website_url, homepage, products)
+        except Exception:
+            pass
+        return insights
+
+    async def _refresh_content(self, db: Session, schedule: RefreshSchedule) -> bool:
+        """Run only the CONTENT_FIELDS extractors and persist just those sections"""
+        insights = BrandInsights(website_url=schedule.website_url)
+        async for section, value in self.scraper_factory().iter_brand_insights(schedule.website_url, sections=CONTENT_FIELDS):
+            apply_section(insights, section, value)
+
+        # Policy and about texts are compared with their stored hashes; the rest by one fingerprint
+        new_hash = _fingerprint(insights.dict(include={field for field in CONTENT_FIELDS if field not in TEXT_FIELDS}))
+        changed = schedule.content_hash is not None and new_hash != schedule.content_hash
+        schedule.content_hash = new_hash
+
+        brand = BrandService.get_brand_by_url(db, schedule.website_url)
+        if brand is not None:
+            changed = changed or any(
+                BrandService.text_changed(brand, field, getattr(insights, field))
+                for field in CONTENT_FIELDS if field in TEXT_FIELDS
+            )
+            BrandService.update_sections(db, brand, insights, CONTENT_FIELDS)
+            brand.scraped_at = datetime.utcnow()
+        else:
+            BrandService.save_insights(db, insights)
+        return changed
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict
+from app.core.config import settings
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a scrape has used up its overall time budget"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Scrape deadline of {seconds:g}s exceeded (timeout)")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of contacting a host whose circuit breaker is open"""
+
+    def __init__(self, host: str):
+        super().__init__(f"Circuit open for {host} after repeated connection failures")
+
+
+class Deadline:
+    """Overall time budget of one scrape, propagated from the API request to every fetch"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds or settings.SCRAPE_DEADLINE
+        self.expires_at = time.monotonic() + self.seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(self.seconds)
+
+    def timeout(self, connect: float, read: float):
+        """(connect, read) timeout for the next request, clipped to the remaining budget"""
+        self.check()
+        remaining = self.remaining()
+        return (min(connect, remaining), min(read, remaining))
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures the host is
+    failed immediately for CIRCUIT_RESET_TIMEOUT seconds, then a single trial request
+    decides whether it closes again
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End a request that says nothing about the host, so a half-open trial can be retried"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """
+    Process-wide breakers keyed by host, shared by every scraper instance; only the
+    CIRCUIT_MAX_HOSTS most recently used hosts are kept
+    """
+
+    def __init__(self):
+        self._breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_TIMEOUT)
+                self._breakers[host] = breaker
+                while len(self._breakers) > settings.CIRCUIT_MAX_HOSTS:
+                    self._breakers.popitem(last=False)
+            else:
+                self._breakers.move_to_end(host)
+            return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                host: {"state": breaker.state, "failures": breaker.failures}
+                for host, breaker in self._breakers.items()
+            }
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,286 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Tuple, Callable, Awaitable, AsyncIterator
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, create_engine, delete, event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.schemas.brand import BrandInsights
+from app.services.resilience import Deadline, DeadlineExceeded
+
+# Identifies this process; each lease is held by a per-call token derived from it
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Scrapes this process is running, keyed by store URL; concurrent callers in the same worker share them
+_in_flight: Dict[str, asyncio.Future] = {}
+
+metadata = MetaData()
+
+cache_table = Table(
+    "shared_cache", metadata,
+    Column("key", String(500), primary_key=True),
+    Column("value", Text, nullable=False),
+    Column("expires_at", Float, nullable=False),
+)
+
+lease_table = Table(
+    "shared_leases", metadata,
+    Column("key", String(500), primary_key=True),
+    Column("owner", String(255), nullable=False),
+    Column("expires_at", Float, nullable=False),
+)
+
+
+class SharedState:
+    """Result cache and expiring leases shared by every worker of a deployment"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        raise NotImplementedError
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the lease on `key` unless another owner holds an unexpired one"""
+        raise NotImplementedError
+
+    def release(self, key: str, owner: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySharedState(SharedState):
+    """Process-local state; the default for single-worker deployments"""
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[str, float]] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[1] <= time.time():
+                self._cache.pop(key, None)
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._cache[key] = (value, time.time() + ttl)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[0] != owner and lease[1] > time.time():
+                return False
+            self._leases[key] = (owner, time.time() + ttl)
+            return True
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+
+class SQLiteSharedState(SharedState):
+    """State in a SQLite file every worker on the host opens; leases rely on SQLite's write lock"""
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+
+        @event.listens_for(self.engine, "connect")
+        def _enable_wal(connection, _):
+            # WAL lets readers poll the cache while another worker writes
+            connection.execute("PRAGMA journal_mode=WAL")
+
+        try:
+            metadata.create_all(self.engine)
+        except OperationalError:
+            # Workers starting together race to create the tables; one of them wins
+            metadata.create_all(self.engine)
+
+    def get(self, key: str) -> Optional[str]:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(cache_table.c.value).where(cache_table.c.key == key, cache_table.c.expires_at > time.time())
+            ).scalar()
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        statement = insert(cache_table).values(key=key, value=value, expires_at=time.time() + ttl)
+        statement = statement.on_conflict_do_update(
+            index_elements=[cache_table.c.key],
+            set_={"value": statement.excluded.value, "expires_at": statement.excluded.expires_at}
+        )
+        with self.engine.begin() as connection:
+            connection.execute(statement)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        statement = insert(lease_table).values(key=key, owner=owner, expires_at=now + ttl)
+        # An existing lease is only taken over once it has expired (or is already ours)
+        statement = statement.on_conflict_do_update(
+            index_elements=[lease_table.c.key],
+            set_={"owner": statement.excluded.owner, "expires_at": statement.excluded.expires_at},
+            where=(lease_table.c.expires_at <= now) | (lease_table.c.owner == owner)
+        )
+        with self.engine.begin() as connection:
+            return connection.execute(statement).rowcount > 0
+
+    def release(self, key: str, owner: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(delete(lease_table).where(lease_table.c.key == key, lease_table.c.owner == owner))
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+class RedisSharedState(SharedState):
+    """State in Redis (or a Redis-compatible local server) for workers spread over several hosts"""
+
+    # Delete the lease only if it is still ours
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("redis is required for a redis:// SHARED_STATE_URL")
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(f"cache:{key}")
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(f"cache:{key}", value, px=int(ttl * 1000))
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        lease_key = f"lease:{key}"
+        if self.client.set(lease_key, owner, nx=True, px=int(ttl * 1000)):
+            return True
+        return self.client.get(lease_key) == owner
+
+    def release(self, key: str, owner: str) -> None:
+        self.client.eval(self.RELEASE_SCRIPT, 1, f"lease:{key}", owner)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_shared_state(url: Optional[str]) -> SharedState:
+    """Backend for SHARED_STATE_URL: unset for in-process state, sqlite:/// or redis://"""
+    if not url:
+        return MemorySharedState()
+    if url.startswith("sqlite"):
+        return SQLiteSharedState(url)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSharedState(url)
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
+
+
+class ScrapeLease:
+    """Outcome of waiting for a store: a cached result, or the right to scrape it"""
+
+    def __init__(self, shared_state: SharedState, cache_key: str, cached: Optional[BrandInsights] = None):
+        self.shared_state = shared_state
+        self.cache_key = cache_key
+        self.cached = cached
+
+    async def store(self, insights: BrandInsights) -> None:
+        ttl = settings.RESULT_CACHE_TTL
+        if insights.scraping_status == "partial":
+            # Briefly, so the next request scrapes again instead of being served a result cut short
+            ttl = min(ttl, settings.PARTIAL_RESULT_CACHE_TTL)
+        if ttl > 0:
+            await asyncio.to_thread(self.shared_state.set, self.cache_key, insights.json(), ttl)
+
+
+@asynccontextmanager
+async def scrape_lease(shared_state: SharedState, website_url: str, deadline: Deadline) -> AsyncIterator[ScrapeLease]:
+    """
+    Wait until this worker may scrape a store, or until another worker's fresh result is cached
+
+    Yields a lease whose `cached` is set when the result can be reused; otherwise the caller
+    holds the store's lease until the block exits and should `store` what it scraped.
+    """
+    cache_key = f"insights:{website_url}"
+    lease_key = f"scrape:{website_url}"
+    # The lease outlives the scrape's own deadline so it only expires if the worker died
+    lease_ttl = deadline.seconds + settings.STAGE_TIMEOUT
+    # Unique per call, so two requests in one worker never both hold the same store's lease
+    owner = f"{WORKER_ID}:{uuid.uuid4().hex}"
+
+    while True:
+        cached = await asyncio.to_thread(shared_state.get, cache_key)
+        if cached is not None:
+            yield ScrapeLease(shared_state, cache_key, BrandInsights.parse_raw(cached))
+            return
+
+        if await asyncio.to_thread(shared_state.acquire, lease_key, owner, lease_ttl):
+            break
+
+        deadline.check()
+        await asyncio.sleep(settings.SHARED_POLL_INTERVAL)
+
+    try:
+        # Another worker may have finished between the cache check and taking the lease
+        cached = await asyncio.to_thread(shared_state.get, cache_key)
+        yield ScrapeLease(shared_state, cache_key, BrandInsights.parse_raw(cached) if cached is not None else None)
+
+    finally:
+        await asyncio.to_thread(shared_state.release, lease_key, owner)
+
+
+async def coordinated_scrape(shared_state: SharedState, website_url: str, deadline: Deadline,
+                             scrape: Callable[[], Awaitable[BrandInsights]]) -> Tuple[BrandInsights, bool]:
+    """
+    Scrape a store at most once at a time across all workers
+
+    Returns a cached result when one is fresh; otherwise runs `scrape` under the store's lease
+    while other workers asking for the same store wait for its result. Callers in the same
+    worker join the scrape already in flight. The flag is True when this call performed the scrape.
+    """
+    while website_url in _in_flight:
+        in_flight = _in_flight[website_url]
+        try:
+            # Shielded so a caller giving up does not cancel the scrape the others wait on
+            return await asyncio.wait_for(asyncio.shield(in_flight), deadline.remaining()), False
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(deadline.seconds)
+        except asyncio.CancelledError:
+            # The caller running the scrape went away; take over unless this caller was cancelled too
+            if not in_flight.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    # Mark failures as retrieved even when no other caller joined
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _in_flight[website_url] = future
+
+    try:
+        async with scrape_lease(shared_state, website_url, deadline) as lease:
+            if lease.cached is not None:
+                insights, scraped = lease.cached, False
+            else:
+                insights, scraped = await scrape(), True
+                await lease.store(insights)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(insights)
+    finally:
+        _in_flight.pop(website_url, None)
+
+    return insights, scraped
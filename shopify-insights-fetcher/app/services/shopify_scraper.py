@@ -1,498 +1,804 @@
 import asyncio
-import json
+import functools
 import re
-from typing import Optional, List, Dict, Any
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, AsyncIterator, Callable, Iterable, Tuple
 from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
-import httpx
+from app.core import json_codec
 from app.core.config import settings
-from app.schemas.brand import BrandInsights, ProductInfo, ContactDetails, SocialHandles, FAQ, ImportantLinks
+from app.core.urls import normalize_url
+from app.schemas.brand import BrandInsights, ProductInfo, ContactDetails, SocialHandles, FAQ, ImportantLinks, CollectionInfo, StoreFingerprint
+from app.services.contact_extractor import ContactExtractor
+from app.services.extractor_registry import apply_section, extractors
+from app.services.faq_extractor import extract_faqs
+from app.services.link_classifier import IMPORTANT_LINK_FIELDS, SOCIAL_PLATFORMS, PageLinks, classify_links, social_profile
+from app.services.page_archive import PageArchive
+from app.services.probe_cache import MISSING_STATUSES, ProbeCache, ProbePlan
+from app.services.fetching import FetchedResponse, ResponseTooLarge, create_session, fetch_bounded
+from app.services.resilience import Deadline, CircuitOpenError, circuit_breakers
+from app.services.store_detector import fingerprint_response, apply_meta_json
+from app.services.structured_data import StructuredData, extract_structured_data
+from app.services.text_extractor import extract_main_text
+
+if TYPE_CHECKING:
+    # requests and bs4 are imported on first use to keep the API's cold start short
+    import requests
+    from bs4 import BeautifulSoup
+
+# Matches /products/<handle> as well as /collections/<collection>/products/<handle>
+PRODUCT_HANDLE_PATTERN = re.compile(r'/products/([^/?#.]+)')
+
+# Character budgets of page text; shorter text does not count as the page's content
+POLICY_TEXT_CHARS = 5000
+ABOUT_TEXT_CHARS = 3000
+MIN_TEXT_CHARS = 100
+
+
+class Page:
+    """A fetched page whose DOM and structured data are parsed at most once per scrape"""
+
+    def __init__(self, url: str, response: FetchedResponse):
+        self.url = url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = response.content
+        self._soup: Optional['BeautifulSoup'] = None
+        self._structured_data: Optional[StructuredData] = None
+        self._links: Optional[PageLinks] = None
+        self._faqs: Optional[List[FAQ]] = None
+        self._main_text: Dict[Tuple[int, int], Optional[str]] = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200
+
+    @property
+    def is_html(self) -> bool:
+        return 'html' in self.headers.get('Content-Type', '').lower()
+
+    def parse(self) -> 'Page':
+        """Build the DOM now, so it can be done off the event loop"""
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+            self._soup = BeautifulSoup(self.content, 'html.parser')
+        return self
+
+    @property
+    def soup(self) -> 'BeautifulSoup':
+        return self.parse()._soup
+
+    @property
+    def structured_data(self) -> StructuredData:
+        if self._structured_data is None:
+            self._structured_data = extract_structured_data(self.soup)
+        return self._structured_data
+
+    @property
+    def links(self) -> PageLinks:
+        """Important links and social profiles, classified in one pass over the page's anchors"""
+        if self._links is None:
+            self._links = classify_links(self.soup, self.url)
+        return self._links
+
+    @property
+    def faqs(self) -> List[FAQ]:
+        """FAQPage JSON-LD entries first, then details/summary, accordions and question headings"""
+        if self._faqs is None:
+            self._faqs = extract_faqs(self.soup, self.structured_data) if self.is_html else []
+        return self._faqs
+
+    def main_text(self, max_chars: int, min_chars: int = 0) -> Optional[str]:
+        """Main content text within `max_chars`, extracted once per budget"""
+        key = (max_chars, min_chars)
+        if key not in self._main_text:
+            self._main_text[key] = extract_main_text(self.soup, max_chars=max_chars, min_chars=min_chars)
+        return self._main_text[key]
+
+
+# Page types: the first candidate page that passes its check, probed in the order learned for
+# the probe group. Only substantial text counts, read no further than its character budget
+extractors.page_type(
+    'privacy_page', 'privacy_policy',
+    ['/pages/privacy-policy', '/policies/privacy-policy', '/privacy-policy', '/privacy'],
+    lambda page: page.main_text(POLICY_TEXT_CHARS, MIN_TEXT_CHARS)
+)
+extractors.page_type(
+    'return_page', 'return_policy',
+    ['/pages/return-policy', '/pages/refund-policy', '/policies/refund-policy', '/return-policy',
+     '/refund-policy', '/pages/returns', '/returns'],
+    lambda page: page.main_text(POLICY_TEXT_CHARS, MIN_TEXT_CHARS)
+)
+# Most specific first; candidates beyond a proven one are requested at once but read in priority order
+extractors.page_type(
+    'faq_page', 'faqs',
+    ['/pages/faq', '/pages/faqs', '/faq', '/faqs', '/pages/frequently-asked-questions', '/help'],
+    lambda page: page.faqs, prefetch=True
+)
+# The contact page usually carries the address and any details the homepage lacks
+extractors.page_type(
+    'contact_page', 'contact',
+    ['/pages/contact', '/contact', '/pages/contact-us', '/contact-us'],
+    lambda page: True
+)
+extractors.page_type(
+    'about_page', 'about',
+    ['/pages/about', '/about', '/pages/about-us', '/about-us', '/pages/our-story', '/our-story'],
+    lambda page: page.main_text(ABOUT_TEXT_CHARS, MIN_TEXT_CHARS)
+)
 
 
 class ShopifyScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': settings.USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
-        self.timeout = settings.REQUEST_TIMEOUT
-
-    async def scrape_brand_insights(self, website_url: str) -> BrandInsights:
+    def __init__(self, session: Optional['requests.Session'] = None, executor: Optional[Executor] = None,
+                 probe_cache: Optional[ProbeCache] = None, archive: Optional[PageArchive] = None, replay: bool = False):
+        # Every response is written to `archive`; with `replay` responses come from it instead of the network
+        self.archive = archive
+        self.replay = replay
+        # The app shares one session so pooled connections and TLS sessions outlive a single scrape
+        self.session = session or (None if replay else create_session())
+        # Thread pool for blocking fetches and HTML parsing; None uses the event loop's default executor
+        self.executor = executor
+        self.timeout = (settings.CONNECT_TIMEOUT, settings.READ_TIMEOUT)
+        # Persisted negative cache and probe statistics; None probes every candidate in listed order
+        self.probe_cache = probe_cache
+        self._probes = ProbePlan('')
+        # Time budget of the current scrape; None for standalone stage calls
+        self._deadline: Optional[Deadline] = None
+        # Whether an open circuit rejected a fetch of the current scrape
+        self._circuit_rejected = False
+        # Page fetches (futures) of the current scrape, keyed by URL
+        self._pages: Dict[str, asyncio.Future] = {}
+        # Prefetched candidate pages no stage read, awaited before probe outcomes are saved
+        self._prefetches: List[asyncio.Future] = []
+        # Products of the crawled catalog, keyed by handle
+        self._catalog_index: Dict[str, ProductInfo] = {}
+        self._catalog_ids: Dict[str, ProductInfo] = {}
+        # Products found only through collections
+        self._extra_products: List[ProductInfo] = []
+
+    async def scrape_brand_insights(self, website_url: str, deadline: Optional[Deadline] = None) -> BrandInsights:
         """Main method to scrape all brand insights from a Shopify store"""
         try:
             # Normalize URL
-            if not website_url.startswith(('http://', 'https://')):
-                website_url = 'https://' + website_url
+            website_url = self._normalize_url(website_url)
             
             # Initialize insights object
             insights = BrandInsights(website_url=website_url)
             
-            # Scrape different components
-            insights.brand_name = await self._get_brand_name(website_url)
-            insights.product_catalog = await self._get_product_catalog(website_url)
-            insights.hero_products = await self._get_hero_products(website_url)
-            insights.privacy_policy = await self._get_privacy_policy(website_url)
-            insights.return_refund_policy = await self._get_return_policy(website_url)
-            insights.faqs = await self._get_faqs(website_url)
-            insights.social_handles = await self._get_social_handles(website_url)
-            insights.contact_details = await self._get_contact_details(website_url)
-            insights.brand_context = await self._get_brand_context(website_url)
-            insights.important_links = await self._get_important_links(website_url)
+            async for section, value in self.iter_brand_insights(website_url, deadline):
+                apply_section(insights, section, value)
             
+            insights.scraping_status = self.scraping_status(website_url)
             return insights
             
         except Exception as e:
             raise Exception(f"Failed to scrape brand insights: {str(e)}")
 
-    async def _get_brand_name(self, website_url: str) -> Optional[str]:
-        """Extract brand name from the website"""
+    async def iter_brand_insights(self, website_url: str, deadline: Optional[Deadline] = None,
+                                  sections: Optional[Iterable[str]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run the registered extractors (all, or those of `sections`) and yield (section, value) as each one completes
+        
+        Every extractor starts as soon as the resources and sections it declares are ready, see
+        app.services.extractor_registry. A section can be yielded more than once; the latest value
+        wins (the catalog is re-emitted when collections turn up products the catalog crawl missed).
+        """
+        website_url = self._normalize_url(website_url)
+        self._pages = {}
+        self._prefetches = []
+        self._catalog_index = {}
+        self._catalog_ids = {}
+        self._extra_products = []
+        self._deadline = deadline or Deadline()
+        self._circuit_rejected = False
+        self._probes = ProbePlan(urlparse(website_url).netloc)
+        
+        # One homepage request decides whether the remaining stages are worth running
+        fingerprint = await self._detect_store(website_url)
+        if not fingerprint.is_shopify:
+            raise Exception(f"Not a Shopify store: {website_url}")
+        yield 'store_fingerprint', fingerprint
+        
+        if self.probe_cache is not None:
+            try:
+                self._probes = await self._run_blocking(self.probe_cache.load, self._probes.store)
+            except Exception:
+                pass
+        
+        # Each resource and extractor is bounded by STAGE_TIMEOUT and the remaining deadline
+        stages = extractors.run(self, website_url, sections, self._run_stage)
         try:
-            response = self.session.get(website_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to get brand name from title tag
-            title = soup.find('title')
-            if title:
-                return title.get_text().strip().split('|')[0].strip()
-            
-            # Try to get from meta property
-            brand_meta = soup.find('meta', property='og:site_name')
-            if brand_meta:
-                return brand_meta.get('content', '').strip()
+            catalog = None
+            async for section, value in stages:
+                if section == 'product_catalog':
+                    catalog = value
+                    if self._extra_products:
+                        value = (catalog or []) + self._extra_products
                 
-            return None
-            
-        except Exception:
-            return None
-
-    async def _get_product_catalog(self, website_url: str) -> Optional[List[ProductInfo]]:
-        """Get complete product catalog using /products.json endpoint"""
-        try:
-            products_url = urljoin(website_url, '/products.json')
-            response = self.session.get(products_url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                products = []
+                yield section, value
                 
-                for product in data.get('products', []):
-                    product_info = ProductInfo(
-                        id=str(product.get('id')),
-                        title=product.get('title'),
-                        handle=product.get('handle'),
-                        vendor=product.get('vendor'),
-                        product_type=product.get('product_type'),
-                        tags=product.get('tags', '').split(',') if product.get('tags') else [],
-                        available=product.get('available'),
-                        images=[img.get('src') for img in product.get('images', [])],
-                        variants=product.get('variants', [])
-                    )
-                    
-                    # Get price from first variant
-                    if product.get('variants'):
-                        variant = product['variants'][0]
-                        product_info.price = variant.get('price')
-                        product_info.compare_at_price = variant.get('compare_at_price')
+                if section == 'collections' and self._extra_products:
+                    yield 'product_catalog', (catalog or []) + self._extra_products
                     
-                    products.append(product_info)
-                
-                return products
-                
-        except Exception:
-            pass
+        finally:
+            # Stop the remaining stages when the consumer goes away early
+            await stages.aclose()
             
-        return None
+            if self.probe_cache is not None:
+                try:
+                    await self._settle_prefetches()
+                    await self._run_blocking(self.probe_cache.save, self._probes)
+                except Exception:
+                    pass
 
-    async def _get_hero_products(self, website_url: str) -> Optional[List[ProductInfo]]:
-        """Get hero products from homepage"""
-        try:
-            response = self.session.get(website_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            hero_products = []
-            
-            # Look for product links on homepage
-            product_links = soup.find_all('a', href=re.compile(r'/products/'))
-            seen_products = set()
-            
-            for link in product_links[:10]:  # Limit to first 10 found
-                href = link.get('href')
-                if href and href not in seen_products:
-                    seen_products.add(href)
-                    
-                    # Try to extract product info from the link element
-                    title_elem = link.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                    if not title_elem:
-                        title_elem = link.find(class_=re.compile(r'title|name|product'))
-                    
-                    price_elem = link.find(class_=re.compile(r'price|cost|amount'))
-                    img_elem = link.find('img')
-                    
-                    product_info = ProductInfo(
-                        title=title_elem.get_text().strip() if title_elem else None,
-                        price=price_elem.get_text().strip() if price_elem else None,
-                        images=[img_elem.get('src')] if img_elem else None
-                    )
-                    
-                    if product_info.title:  # Only add if we found a title
-                        hero_products.append(product_info)
-            
-            return hero_products if hero_products else None
-            
-        except Exception:
-            return None
+    async def extract_sections(self, website_url: str, sections: Iterable[str]) -> Dict[str, Any]:
+        """Run only the extractors of `sections` and what they depend on, reusing pages this scraper already fetched"""
+        website_url = self._normalize_url(website_url)
+        return {section: value async for section, value in extractors.run(self, website_url, sections, self._run_stage)}
 
-    async def _get_privacy_policy(self, website_url: str) -> Optional[str]:
-        """Get privacy policy content"""
-        try:
-            # Common privacy policy URLs
-            privacy_urls = [
-                '/pages/privacy-policy',
-                '/policies/privacy-policy',
-                '/privacy-policy',
-                '/privacy'
-            ]
+    def scraping_status(self, website_url: str) -> str:
+        """'partial' when stages of the current scrape were cut short by the deadline or an open circuit"""
+        if self._deadline is not None and self._deadline.expired:
+            return "partial"
+        if self._circuit_rejected:
+            return "partial"
+        return "completed"
+
+    @staticmethod
+    def _normalize_url(website_url: str) -> str:
+        return normalize_url(website_url)
+
+    async def _run_stage(self, stage):
+        """Await a stage within its own timeout; a stage that runs out of time yields None"""
+        timeout = settings.STAGE_TIMEOUT
+        if self._deadline is not None:
+            timeout = min(timeout, self._deadline.remaining())
             
-            for path in privacy_urls:
-                try:
-                    url = urljoin(website_url, path)
-                    response = self.session.get(url, timeout=self.timeout)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Remove script and style elements
-                        for script in soup(["script", "style"]):
-                            script.decompose()
-                        
-                        # Get text content
-                        text = soup.get_text()
-                        lines = (line.strip() for line in text.splitlines())
-                        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                        text = ' '.join(chunk for chunk in chunks if chunk)
-                        
-                        if len(text) > 100:  # Only return if substantial content
-                            return text[:5000]  # Limit to 5000 chars
-                            
-                except Exception:
-                    continue
-                    
+        try:
+            return await asyncio.wait_for(stage, timeout=timeout)
+        except asyncio.TimeoutError:
             return None
+
+    async def _fetch(self, url: str, resource: str = 'html', items_key: Optional[str] = None, **kwargs) -> FetchedResponse:
+        """
+        GET through the host's circuit breaker with connect/read timeouts clipped to the deadline
+        
+        The body is streamed and capped at MAX_BODY_BYTES[resource]; with `items_key` the
+        top-level JSON array of that name is decoded incrementally into `response.items`.
+        """
+        if self.replay:
+            return self.archive.replay(url, kwargs.get('params'), items_key)
+
+        import requests
+
+        host = urlparse(url).netloc
+        breaker = circuit_breakers.get(host)
+        # An exhausted deadline fails before the breaker hands out its half-open trial
+        timeout = self._deadline.timeout(*self.timeout) if self._deadline else self.timeout
+        
+        if not breaker.allow():
+            self._circuit_rejected = True
+            raise CircuitOpenError(host)
             
-        except Exception:
-            return None
+        try:
+            response = await self._run_blocking(
+                fetch_bounded, self.session, url, resource, items_key, self._deadline, timeout=timeout, **kwargs
+            )
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            if self._clipped_timeout(e, timeout):
+                # Only the deadline was too short; the host might well have answered in its configured time
+                breaker.release()
+            else:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            # Oversized bodies, redirect loops, the deadline or a cancelled stage: no verdict on the host
+            breaker.release()
+            raise
+            
+        # Missing pages are normal while probing; server errors and throttling are not
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            
+        if self.archive is not None:
+            try:
+                await self._run_blocking(self.archive.record, url, kwargs.get('params'), response, resource, items_key)
+            except OSError:
+                pass
 
-    async def _get_return_policy(self, website_url: str) -> Optional[str]:
-        """Get return/refund policy content"""
+        return response
+
+    def _clipped_timeout(self, error: Exception, timeout) -> bool:
+        """Whether `error` is a timeout that fired only because the deadline clipped the configured one"""
+        import requests
+        from urllib3.exceptions import ReadTimeoutError
+
+        if isinstance(error, requests.ConnectTimeout):
+            return timeout[0] < self.timeout[0]
+        # A read timeout while streaming the body surfaces as a ConnectionError wrapping urllib3's error
+        if isinstance(error, requests.ReadTimeout) or (error.args and isinstance(error.args[0], ReadTimeoutError)):
+            return timeout[1] < self.timeout[1]
+        return False
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run blocking work in the scraper's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _get_page(self, url: str) -> Page:
+        """Fetch a page once per scrape; later stages reuse the response and its parsed DOM"""
+        fetch = self._pages.get(url)
+        
+        # Concurrent stages asking for the same URL share one in-flight fetch; failed fetches
+        # stay cached too so a dead host is not retried by every stage
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._load_page(url))
+            # Mark failures as retrieved even if every stage waiting on them timed out
+            fetch.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pages[url] = fetch
+            
+        # Shielded so a stage timing out does not cancel the fetch other stages are waiting on
+        return await asyncio.shield(fetch)
+
+    async def _load_page(self, url: str) -> Page:
+        page = Page(url, await self._fetch(url))
+        
+        # Parse HTML in the pool rather than on the event loop
+        if page.ok and page.is_html:
+            await self._run_blocking(page.parse)
+            
+        return page
+
+    @extractors.resource('homepage')
+    async def _get_homepage(self, website_url: str) -> Page:
+        """Fetch the homepage, raising for error responses"""
+        page = await self._get_page(website_url)
+        
+        if not page.ok:
+            raise Exception(f"Homepage returned status {page.status_code}")
+            
+        return page
+
+    async def _find_page(self, group: str, website_url: str, paths: List[str], accept: Callable[[Page], Any],
+                         prefetch: bool = False) -> Optional[Page]:
+        """
+        First candidate page that passes `accept`, skipping paths known to be missing for this
+        store and trying the paths that most often succeed across stores first
+        
+        With `prefetch` the candidates are requested at once, but pages are still read in order.
+        When the best candidate is proven, the first PROBE_SEQUENTIAL_CANDIDATES are tried alone
+        first, so a store where the usual path works costs a single request.
+        """
+        paths = self._probes.order(group, paths)
+        sequential = 0
+        if paths and self._probes.proven(group, paths[0]):
+            sequential = settings.PROBE_SEQUENTIAL_CANDIDATES
+        unread: Dict[str, asyncio.Future] = {}
+        
         try:
-            # Common return policy URLs
-            return_urls = [
-                '/pages/return-policy',
-                '/pages/refund-policy',
-                '/policies/refund-policy',
-                '/return-policy',
-                '/refund-policy',
-                '/pages/returns',
-                '/returns'
-            ]
-            
-            for path in return_urls:
+            for index, path in enumerate(paths):
+                if prefetch and index == sequential:
+                    for remaining in paths[index:]:
+                        fetch = asyncio.ensure_future(self._get_page(urljoin(website_url, remaining)))
+                        fetch.add_done_callback(lambda f: f.cancelled() or f.exception())
+                        unread[remaining] = fetch
+                        
+                fetch = unread.pop(path, None)
                 try:
-                    url = urljoin(website_url, path)
-                    response = self.session.get(url, timeout=self.timeout)
+                    page = await (fetch or self._get_page(urljoin(website_url, path)))
+                    accepted = bool(accept(page)) if page.ok else False
+                    self._probes.record(group, path, page.status_code, accepted)
                     
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                    if accepted:
+                        return page
                         
-                        # Remove script and style elements
-                        for script in soup(["script", "style"]):
-                            script.decompose()
-                        
-                        # Get text content
-                        text = soup.get_text()
-                        lines = (line.strip() for line in text.splitlines())
-                        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                        text = ' '.join(chunk for chunk in chunks if chunk)
-                        
-                        if len(text) > 100:  # Only return if substantial content
-                            return text[:5000]  # Limit to 5000 chars
-                            
                 except Exception:
                     continue
                     
             return None
             
-        except Exception:
-            return None
+        finally:
+            # Lower-priority pages keep loading; the ones that turn out missing are remembered too
+            probes = self._probes
+            for path, fetch in unread.items():
+                fetch.add_done_callback(functools.partial(self._record_if_missing, probes, group, path))
+                self._prefetches.append(fetch)
 
-    async def _get_faqs(self, website_url: str) -> Optional[List[FAQ]]:
-        """Get FAQ content"""
-        try:
-            # Common FAQ URLs
-            faq_urls = [
-                '/pages/faq',
-                '/pages/faqs',
-                '/faq',
-                '/faqs',
-                '/pages/frequently-asked-questions',
-                '/help'
-            ]
+    async def _settle_prefetches(self) -> None:
+        """Let unread prefetched pages finish within the deadline so their misses are recorded; cancel the rest"""
+        pending = [fetch for fetch in self._prefetches if not fetch.done()]
+        self._prefetches = []
+        if pending:
+            _, unfinished = await asyncio.wait(pending, timeout=self._deadline.remaining() if self._deadline else None)
+            for fetch in unfinished:
+                fetch.cancel()
+        # Done-callbacks run on the next loop iteration, before the outcomes are handed to the saving thread
+        await asyncio.sleep(0)
+
+    async def _detect_store(self, website_url: str) -> StoreFingerprint:
+        """
+        Fingerprint the store from the homepage, checking /meta.json only when that is inconclusive
+        
+        Error responses are fingerprinted too: a homepage that answers bots with 403/503 often
+        still carries Shopify's headers, and the JSON endpoints may be served regardless.
+        """
+        page = await self._get_page(website_url)
+        fingerprint = fingerprint_response(page.headers, page.content)
+        
+        if not fingerprint.is_shopify:
+            try:
+                meta_page = await self._get_page(urljoin(website_url, '/meta.json'))
+                if meta_page.ok:
+                    fingerprint = apply_meta_json(fingerprint, json_codec.loads(meta_page.content))
+            except Exception:
+                pass
+                
+        if not fingerprint.is_shopify and not page.ok:
+            # Nothing identified the store; report the failed homepage rather than a non-Shopify site
+            raise Exception(f"Homepage returned status {page.status_code}")
             
-            for path in faq_urls:
-                try:
-                    url = urljoin(website_url, path)
-                    response = self.session.get(url, timeout=self.timeout)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        faqs = []
-                        
-                        # Look for FAQ patterns
-                        # Pattern 1: Question-Answer pairs in specific elements
-                        qa_pairs = soup.find_all(['div', 'section'], class_=re.compile(r'faq|question|qa'))
-                        
-                        for qa in qa_pairs:
-                            question_elem = qa.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'b'])
-                            if question_elem:
-                                question = question_elem.get_text().strip()
-                                
-                                # Look for answer after question
-                                answer_elem = question_elem.find_next_sibling(['p', 'div', 'span'])
-                                if answer_elem:
-                                    answer = answer_elem.get_text().strip()
-                                    if question and answer and len(question) > 10:
-                                        faqs.append(FAQ(question=question, answer=answer))
-                        
-                        # Pattern 2: Look for structured FAQ data
-                        if not faqs:
-                            questions = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'], string=re.compile(r'\?'))
-                            for q in questions[:10]:  # Limit to 10
-                                question = q.get_text().strip()
-                                answer_elem = q.find_next_sibling(['p', 'div'])
-                                if answer_elem:
-                                    answer = answer_elem.get_text().strip()
-                                    if question and answer:
-                                        faqs.append(FAQ(question=question, answer=answer))
-                        
-                        if faqs:
-                            return faqs[:20]  # Limit to 20 FAQs
-                            
-                except Exception:
-                    continue
-                    
-            return None
+        return fingerprint
+
+    @extractors.extractor('brand_name', requires=('homepage',))
+    async def _get_brand_name(self, website_url: str, homepage: Page) -> Optional[str]:
+        """Extract brand name from the website"""
+        # Organization/WebSite JSON-LD and og:site_name name the brand explicitly
+        brand_name = homepage.structured_data.brand_name
+        if brand_name:
+            return brand_name
+        
+        # Fall back to the title tag
+        if homepage.structured_data.title:
+            return homepage.structured_data.title.split('|')[0].strip()
             
-        except Exception:
-            return None
+        return None
 
-    async def _get_social_handles(self, website_url: str) -> Optional[SocialHandles]:
-        """Extract social media handles"""
+    @extractors.resource('catalog')
+    async def _get_product_catalog(self, website_url: str, first_page: Optional[List[Dict[str, Any]]] = None) -> Optional[List[ProductInfo]]:
+        """Get complete product catalog using /products.json endpoint, starting from an already fetched `first_page`"""
         try:
-            response = self.session.get(website_url, timeout=self.timeout)
-            response.raise_for_status()
+            products = []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            social_handles = SocialHandles()
+            async for page in self._iter_product_pages(website_url, first_page):
+                products.extend(self._parse_product(product) for product in page)
             
-            # Find all social media links
-            social_links = soup.find_all('a', href=re.compile(r'(instagram|facebook|twitter|tiktok|youtube|linkedin)'))
+            # Later stages look products up by handle or id instead of re-fetching them
+            self._catalog_index = {product.handle: product for product in products if product.handle}
+            self._catalog_ids = {product.id: product for product in products}
             
-            for link in social_links:
-                href = link.get('href', '')
-                
-                if 'instagram.com' in href:
-                    social_handles.instagram = href
-                elif 'facebook.com' in href:
-                    social_handles.facebook = href
-                elif 'twitter.com' in href or 'x.com' in href:
-                    social_handles.twitter = href
-                elif 'tiktok.com' in href:
-                    social_handles.tiktok = href
-                elif 'youtube.com' in href:
-                    social_handles.youtube = href
-                elif 'linkedin.com' in href:
-                    social_handles.linkedin = href
-            
-            # Check if any social handles were found
-            if any([social_handles.instagram, social_handles.facebook, social_handles.twitter, 
-                   social_handles.tiktok, social_handles.youtube, social_handles.linkedin]):
-                return social_handles
+            return products if products else None
                 
-            return None
-            
         except Exception:
-            return None
-
-    async def _get_contact_details(self, website_url: str) -> Optional[ContactDetails]:
-        """Extract contact details"""
-        try:
-            response = self.session.get(website_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            contact_details = ContactDetails()
-            
-            # Get all text content
-            text_content = soup.get_text()
-            
-            # Extract emails using regex
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = list(set(re.findall(email_pattern, text_content)))
-            
-            # Filter out common non-contact emails
-            filtered_emails = [email for email in emails if not any(
-                skip in email.lower() for skip in ['example', 'test', 'noreply', 'no-reply']
-            )]
+            pass
             
-            if filtered_emails:
-                contact_details.emails = filtered_emails[:5]  # Limit to 5 emails
+        return None
+
+    @extractors.extractor('product_catalog', requires=('catalog',))
+    async def _get_catalog_section(self, website_url: str, catalog: Optional[List[ProductInfo]]) -> Optional[List[ProductInfo]]:
+        return catalog
+
+    async def _iter_product_pages(self, website_url: str, first_page: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield raw /products.json pages one at a time until the catalog is exhausted"""
+        async for page in self._iter_json_pages(urljoin(website_url, '/products.json'), 'products', settings.MAX_PRODUCT_PAGES, first_page):
+            yield page
+
+    async def _iter_json_pages(self, url: str, key: str, max_pages: int,
+                               first_page: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the `key` list of a paginated Shopify JSON endpoint one page at a time; `first_page` skips fetching page 1"""
+        for page_number in range(1, max_pages + 1):
+            if page_number == 1 and first_page is not None:
+                page = first_page
+            else:
+                try:
+                    response = await self._fetch(
+                        url, resource='products', items_key=key,
+                        params={'limit': settings.PRODUCTS_PAGE_LIMIT, 'page': page_number}
+                    )
+                except ResponseTooLarge:
+                    # An oversized page ends the crawl; the pages already read are kept
+                    return
+                
+                if response.status_code != 200:
+                    return
+                
+                page = response.items
+                
+            if not page:
+                return
             
-            # Extract phone numbers using regex
-            phone_pattern = r'(\+?1?[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4})'
-            phones = list(set(re.findall(phone_pattern, text_content)))
+            yield page
             
-            if phones:
-                contact_details.phone_numbers = phones[:3]  # Limit to 3 phones
+            # A short page means there is nothing left to fetch
+            if len(page) < settings.PRODUCTS_PAGE_LIMIT:
+                return
+
+    @extractors.extractor('collections', requires=('catalog',))
+    async def _get_collections(self, website_url: str, catalog: Optional[List[ProductInfo]]) -> Optional[List[CollectionInfo]]:
+        """Crawl /collections.json and record which products belong to each collection"""
+        # Runs after the catalog crawl so products it already has are only referenced by id
+        try:
+            collections = []
+            
+            async for page in self._iter_json_pages(urljoin(website_url, '/collections.json'), 'collections', settings.MAX_COLLECTION_PAGES):
+                collections.extend(
+                    CollectionInfo(
+                        id=str(collection.get('id')),
+                        handle=collection.get('handle'),
+                        title=collection.get('title'),
+                        products_count=collection.get('products_count')
+                    )
+                    for collection in page if collection.get('handle')
+                )
             
-            # Try to get address from contact page
-            contact_urls = ['/pages/contact', '/contact', '/pages/contact-us', '/contact-us']
+            collections = collections[:settings.MAX_COLLECTIONS]
+            if not collections:
+                return None
             
-            for path in contact_urls:
-                try:
-                    url = urljoin(website_url, path)
-                    contact_response = self.session.get(url, timeout=self.timeout)
-                    
-                    if contact_response.status_code == 200:
-                        contact_soup = BeautifulSoup(contact_response.content, 'html.parser')
-                        
-                        # Look for address patterns
-                        address_elem = contact_soup.find(string=re.compile(r'\d+.*(?:street|st|avenue|ave|road|rd|drive|dr|lane|ln)', re.IGNORECASE))
-                        if address_elem:
-                            contact_details.address = address_elem.strip()[:200]
-                            break
-                            
-                except Exception:
-                    continue
+            semaphore = asyncio.Semaphore(settings.COLLECTION_CONCURRENCY)
+            await asyncio.gather(*(self._fill_collection(website_url, collection, semaphore) for collection in collections))
             
-            # Check if any contact details were found
-            if any([contact_details.emails, contact_details.phone_numbers, contact_details.address]):
-                return contact_details
-                
-            return None
+            return collections
             
         except Exception:
             return None
 
-    async def _get_brand_context(self, website_url: str) -> Optional[str]:
-        """Get brand context/about information"""
-        try:
-            # Try about page first
-            about_urls = ['/pages/about', '/about', '/pages/about-us', '/about-us', '/pages/our-story', '/our-story']
-            
-            for path in about_urls:
-                try:
-                    url = urljoin(website_url, path)
-                    response = self.session.get(url, timeout=self.timeout)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Remove script and style elements
-                        for script in soup(["script", "style"]):
-                            script.decompose()
-                        
-                        # Get text content
-                        text = soup.get_text()
-                        lines = (line.strip() for line in text.splitlines())
-                        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                        text = ' '.join(chunk for chunk in chunks if chunk)
-                        
-                        if len(text) > 100:  # Only return if substantial content
-                            return text[:3000]  # Limit to 3000 chars
-                            
-                except Exception:
-                    continue
-            
-            # If no about page, try to get from homepage
+    async def _fill_collection(self, website_url: str, collection: CollectionInfo, semaphore: asyncio.Semaphore) -> None:
+        """Collect the product ids of one collection, reusing catalog products instead of storing payloads"""
+        async with semaphore:
             try:
-                response = self.session.get(website_url, timeout=self.timeout)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for brand description in meta tags
-                description_meta = soup.find('meta', attrs={'name': 'description'})
-                if description_meta:
-                    description = description_meta.get('content', '').strip()
-                    if len(description) > 50:
-                        return description
+                url = urljoin(website_url, f'/collections/{collection.handle}/products.json')
                 
+                async for page in self._iter_json_pages(url, 'products', settings.MAX_PRODUCT_PAGES):
+                    for product in page:
+                        product_id = str(product.get('id'))
+                        collection.product_ids.append(product_id)
+                        
+                        # Products the catalog crawl missed are kept once, in the catalog itself
+                        if product_id not in self._catalog_ids:
+                            product_info = self._parse_product(product)
+                            self._catalog_ids[product_id] = product_info
+                            self._extra_products.append(product_info)
+                            if product_info.handle:
+                                self._catalog_index.setdefault(product_info.handle, product_info)
+                                
             except Exception:
                 pass
-                
-            return None
-            
-        except Exception:
+
+    @extractors.extractor('product_collections', requires=('collections',))
+    async def _get_product_collections(self, website_url: str, collections: Optional[List[CollectionInfo]]) -> Optional[Dict[str, List[str]]]:
+        return self._index_collections(collections)
+
+    @staticmethod
+    def _index_collections(collections: Optional[List[CollectionInfo]]) -> Optional[Dict[str, List[str]]]:
+        """Build the product id -> collection handles index"""
+        if not collections:
             return None
+        
+        index: Dict[str, List[str]] = {}
+        for collection in collections:
+            for product_id in collection.product_ids:
+                index.setdefault(product_id, []).append(collection.handle)
+        
+        return index
 
-    async def _get_important_links(self, website_url: str) -> Optional[ImportantLinks]:
-        """Get important links like order tracking, contact, blogs"""
+    @staticmethod
+    def _parse_product(product: Dict[str, Any]) -> ProductInfo:
+        """Convert a raw /products.json entry into a ProductInfo"""
+        product_info = ProductInfo(
+            id=str(product.get('id')),
+            title=product.get('title'),
+            handle=product.get('handle'),
+            vendor=product.get('vendor'),
+            product_type=product.get('product_type'),
+            tags=product.get('tags', '').split(',') if product.get('tags') else [],
+            available=product.get('available'),
+            images=[img.get('src') for img in product.get('images', [])],
+            variants=product.get('variants', [])
+        )
+        
+        # Get price from first variant
+        if product.get('variants'):
+            variant = product['variants'][0]
+            product_info.price = variant.get('price')
+            product_info.compare_at_price = variant.get('compare_at_price')
+        
+        return product_info
+
+    @staticmethod
+    def _product_from_js(product: Dict[str, Any]) -> ProductInfo:
+        """Convert a /products/<handle>.js payload, whose prices are in cents, into a ProductInfo"""
+        def money(cents: Any) -> Optional[str]:
+            return f"{cents / 100:.2f}" if isinstance(cents, (int, float)) else None
+        
+        variants = product.get('variants') or []
+        tags = product.get('tags') or []
+        
+        product_info = ProductInfo(
+            id=str(product.get('id')),
+            title=product.get('title'),
+            handle=product.get('handle'),
+            vendor=product.get('vendor'),
+            product_type=product.get('type'),
+            tags=tags.split(',') if isinstance(tags, str) else tags,
+            available=product.get('available'),
+            images=[urljoin('https:', src) for src in product.get('images') or [] if isinstance(src, str)],
+            variants=[
+                dict(variant, price=money(variant.get('price')), compare_at_price=money(variant.get('compare_at_price')))
+                for variant in variants
+            ]
+        )
+        
+        if variants:
+            product_info.price = money(variants[0].get('price'))
+            product_info.compare_at_price = money(variants[0].get('compare_at_price'))
+        else:
+            product_info.price = money(product.get('price'))
+            product_info.compare_at_price = money(product.get('compare_at_price'))
+        
+        return product_info
+
+    @staticmethod
+    def _product_from_json_ld(product: Dict[str, Any]) -> ProductInfo:
+        """Convert a JSON-LD Product block into a ProductInfo"""
+        offers = product.get('offers') or {}
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        
+        image = product.get('image')
+        if isinstance(image, dict):
+            image = image.get('url')
+        images = image if isinstance(image, list) else [image] if image else None
+        
+        handle = None
+        url = product.get('url') or offers.get('url')
+        if isinstance(url, str) and '/products/' in url:
+            handle = urlparse(url).path.split('/products/')[-1].strip('/') or None
+        
+        brand = product.get('brand')
+        price = offers.get('price', offers.get('lowPrice'))
+        
+        return ProductInfo(
+            title=product.get('name'),
+            handle=handle,
+            vendor=brand.get('name') if isinstance(brand, dict) else brand,
+            price=str(price) if price is not None else None,
+            available=str(offers.get('availability', '')).endswith('InStock') if offers.get('availability') else None,
+            images=[str(src) for src in images] if images else None
+        )
+
+    @extractors.extractor('hero_products', requires=('homepage', 'catalog'))
+    async def _get_hero_products(self, website_url: str, homepage: Page, catalog: Optional[List[ProductInfo]]) -> Optional[List[ProductInfo]]:
+        """Get hero products from homepage"""
         try:
-            response = self.session.get(website_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            important_links = ImportantLinks()
+            # Handles in homepage order: Product JSON-LD first, then product links
+            json_ld_products = {}
+            for product in homepage.structured_data.products:
+                product_info = self._product_from_json_ld(product)
+                if product_info.handle:
+                    json_ld_products.setdefault(product_info.handle, product_info)
+            
+            handles = list(json_ld_products)
+            for link in homepage.soup.find_all('a', href=PRODUCT_HANDLE_PATTERN):
+                match = PRODUCT_HANDLE_PATTERN.search(link['href'])
+                if match and match.group(1) not in handles:
+                    handles.append(match.group(1))
+            
+            handles = handles[:settings.HERO_PRODUCTS_LIMIT]
+            if not handles:
+                return None
+            
+            # Resolve against the crawled catalog, fetching only the handles it does not contain
+            resolved = {handle: self._catalog_index[handle] for handle in handles if handle in self._catalog_index}
+            missing = [handle for handle in handles if handle not in resolved]
+            
+            if missing:
+                semaphore = asyncio.Semaphore(settings.HERO_PRODUCT_CONCURRENCY)
+                fetched = await asyncio.gather(*(self._get_product_by_handle(website_url, handle, semaphore) for handle in missing))
+                resolved.update((handle, product) for handle, product in zip(missing, fetched) if product)
+            
+            hero_products = [
+                resolved.get(handle) or json_ld_products.get(handle)
+                for handle in handles
+            ]
+            hero_products = [product for product in hero_products if product and product.title]
             
-            # Find all links
-            all_links = soup.find_all('a', href=True)
+            return hero_products if hero_products else None
             
-            for link in all_links:
-                href = link.get('href', '').lower()
-                text = link.get_text().lower().strip()
-                
-                # Make absolute URL
-                full_url = urljoin(website_url, link.get('href'))
-                
-                # Order tracking
-                if any(keyword in href or keyword in text for keyword in ['track', 'order', 'tracking']):
-                    if not important_links.order_tracking:
-                        important_links.order_tracking = full_url
-                
-                # Contact us
-                elif any(keyword in href or keyword in text for keyword in ['contact', 'support']):
-                    if not important_links.contact_us:
-                        important_links.contact_us = full_url
-                
-                # Blogs
-                elif any(keyword in href or keyword in text for keyword in ['blog', 'news', 'article']):
-                    if not important_links.blogs:
-                        important_links.blogs = full_url
-                
-                # About us
-                elif any(keyword in href or keyword in text for keyword in ['about', 'story']):
-                    if not important_links.about_us:
-                        important_links.about_us = full_url
+        except Exception:
+            return None
+
+    async def _get_product_by_handle(self, website_url: str, handle: str, semaphore: asyncio.Semaphore) -> Optional[ProductInfo]:
+        """Fetch a single product from /products/<handle>.js"""
+        async with semaphore:
+            try:
+                url = urljoin(website_url, f'/products/{handle}.js')
+                response = await self._fetch(url, resource='json')
                 
-                # Shipping info
-                elif any(keyword in href or keyword in text for keyword in ['shipping', 'delivery']):
-                    if not important_links.shipping_info:
-                        important_links.shipping_info = full_url
-            
-            # Check if any important links were found
-            if any([important_links.order_tracking, important_links.contact_us, important_links.blogs,
-                   important_links.about_us, important_links.shipping_info]):
-                return important_links
+                if response.status_code == 200:
+                    return self._product_from_js(response.json())
+                    
+            except Exception:
+                pass
                 
+        return None
+
+    @extractors.extractor('privacy_policy', requires=('privacy_page',))
+    async def _get_privacy_policy(self, website_url: str, privacy_page: Optional[Page]) -> Optional[str]:
+        """Get privacy policy content"""
+        return privacy_page.main_text(POLICY_TEXT_CHARS, MIN_TEXT_CHARS) if privacy_page else None
+
+    @extractors.extractor('return_refund_policy', requires=('return_page',))
+    async def _get_return_policy(self, website_url: str, return_page: Optional[Page]) -> Optional[str]:
+        """Get return/refund policy content"""
+        return return_page.main_text(POLICY_TEXT_CHARS, MIN_TEXT_CHARS) if return_page else None
+
+    @extractors.extractor('faqs', requires=('faq_page',))
+    async def _get_faqs(self, website_url: str, faq_page: Optional[Page]) -> Optional[List[FAQ]]:
+        """Get FAQ content from the first candidate page that has any"""
+        return faq_page.faqs if faq_page else None
+
+    @staticmethod
+    def _record_if_missing(probes: ProbePlan, group: str, path: str, fetch: asyncio.Future) -> None:
+        if not fetch.cancelled() and fetch.exception() is None and fetch.result().status_code in MISSING_STATUSES:
+            probes.record(group, path, fetch.result().status_code, False)
+
+    @extractors.extractor('social_handles', requires=('homepage',))
+    async def _get_social_handles(self, website_url: str, homepage: Page) -> Optional[SocialHandles]:
+        """Extract social media profiles and the handles parsed from their URLs"""
+        # Profiles declared in Organization sameAs take precedence over footer/header links
+        profiles = {}
+        for href in homepage.structured_data.same_as:
+            profile = social_profile(href)
+            if profile is not None:
+                profiles.setdefault(profile.platform, profile)
+        
+        for platform, profile in homepage.links.social.items():
+            profiles.setdefault(platform, profile)
+        
+        if not profiles:
             return None
             
-        except Exception:
-            return None
\ No newline at end of file
+        social_handles = SocialHandles(handles={})
+        for platform in SOCIAL_PLATFORMS:
+            if platform in profiles:
+                setattr(social_handles, platform, profiles[platform].url)
+                social_handles.handles[platform] = profiles[platform].handle
+                
+        return social_handles
+
+    @extractors.extractor('contact_details', requires=('homepage', 'contact_page'))
+    async def _get_contact_details(self, website_url: str, homepage: Page, contact_page: Optional[Page]) -> Optional[ContactDetails]:
+        """Extract contact details"""
+        contact_extractor = ContactExtractor()
+        
+        # Scan JSON-LD, mailto:/tel: links and footer/contact blocks on the homepage
+        contact_extractor.scan_homepage(homepage.soup, homepage.structured_data)
+        
+        if contact_page is not None:
+            contact_extractor.scan_contact_page(contact_page.soup, contact_page.structured_data)
+        
+        return contact_extractor.to_contact_details()
+
+    @extractors.extractor('brand_context', requires=('homepage', 'about_page'))
+    async def _get_brand_context(self, website_url: str, homepage: Page, about_page: Optional[Page]) -> Optional[str]:
+        """Get brand context/about information"""
+        if about_page is not None:
+            return about_page.main_text(ABOUT_TEXT_CHARS, MIN_TEXT_CHARS)
+        
+        # If no about page, use the Organization description or meta description from the homepage
+        description = homepage.structured_data.description
+        if description and len(description) > 50:
+            return description
+            
+        return None
+
+    @extractors.extractor('important_links', requires=('homepage',))
+    async def _get_important_links(self, website_url: str, homepage: Page) -> Optional[ImportantLinks]:
+        """Get important links like order tracking, contact, blogs"""
+        found = homepage.links.important
+        
+        if any(field in found for field in IMPORTANT_LINK_FIELDS):
+            return ImportantLinks(**found)
+            
+        return None
@@ -0,0 +1,87 @@
+import json
+import re
+from typing import Optional, Dict, Any, Mapping
+from app.schemas.brand import StoreFingerprint
+
+# Response headers only Shopify's edge and storefront renderer send
+SHOPIFY_HEADERS = (
+    'x-shopid', 'x-shopify-stage', 'x-shardid', 'x-sorting-hat-shopid',
+    'x-sorting-hat-podid', 'x-storefront-renderer-rendered', 'x-shopify-request-id',
+)
+
+# Markers in the homepage markup, checked against the first part of the document only
+BODY_MARKERS = {
+    'shopify_theme': re.compile(rb'Shopify\.theme\s*='),
+    'shopify_cdn': re.compile(rb'cdn\.shopify\.com|/cdn/shop/'),
+    'shopify_analytics': re.compile(rb'ShopifyAnalytics|shopify-features'),
+    'shopify_sections': re.compile(rb'shopify-section'),
+}
+
+FEATURE_MARKERS = {
+    'shop_pay': re.compile(rb'shop-pay|shopify_pay|shop_pay', re.IGNORECASE),
+    'dynamic_checkout': re.compile(rb'shopify-payment-button'),
+    'sections_everywhere': re.compile(rb'shopify-section-group|shopify-app-block'),
+    'predictive_search': re.compile(rb'predictive-search'),
+}
+
+THEME_PATTERN = re.compile(rb'Shopify\.theme\s*=\s*(\{.*?\})\s*;')
+SHOP_PATTERN = re.compile(rb'Shopify\.shop\s*=\s*["\']([^"\']+)["\']')
+CURRENCY_PATTERN = re.compile(rb'Shopify\.currency\s*=\s*\{[^}]*"active"\s*:\s*"([A-Z]{3})"')
+LOCALE_PATTERN = re.compile(rb'Shopify\.locale\s*=\s*["\']([^"\']+)["\']')
+
+# Only the head of the document is scanned; Shopify's bootstrap scripts live there
+SCAN_BYTES = 256 * 1024
+
+
+def _match(pattern: re.Pattern, content: bytes) -> Optional[str]:
+    match = pattern.search(content)
+    return match.group(1).decode('utf-8', 'replace') if match else None
+
+
+def fingerprint_response(headers: Mapping[str, str], content: bytes) -> StoreFingerprint:
+    """Identify a Shopify storefront from one homepage response"""
+    fingerprint = StoreFingerprint()
+    lowered = {key.lower(): value for key, value in headers.items()}
+    head = content[:SCAN_BYTES]
+
+    fingerprint.signals = [header for header in SHOPIFY_HEADERS if header in lowered]
+    powered_by = lowered.get('powered-by', '') + lowered.get('x-powered-by', '')
+    if 'shopify' in powered_by.lower():
+        fingerprint.signals.append('powered-by')
+    fingerprint.signals += [name for name, pattern in BODY_MARKERS.items() if pattern.search(head)]
+    fingerprint.is_shopify = bool(fingerprint.signals)
+
+    fingerprint.shop_id = lowered.get('x-shopid') or lowered.get('x-sorting-hat-shopid')
+    fingerprint.myshopify_domain = _match(SHOP_PATTERN, head)
+    fingerprint.currency = _match(CURRENCY_PATTERN, head)
+    fingerprint.locale = _match(LOCALE_PATTERN, head)
+
+    theme = _match(THEME_PATTERN, head)
+    if theme:
+        try:
+            theme_data = json.loads(theme)
+            fingerprint.theme_name = theme_data.get('name')
+            fingerprint.theme_id = str(theme_data['id']) if theme_data.get('id') else None
+            fingerprint.theme_store_id = str(theme_data['theme_store_id']) if theme_data.get('theme_store_id') else None
+        except ValueError:
+            pass
+
+    fingerprint.features = [name for name, pattern in FEATURE_MARKERS.items() if pattern.search(head)]
+    if 'hydrogen' in powered_by.lower() or 'oxygen-full-page-cache' in lowered:
+        # Headless storefronts do not serve the Online Store JSON endpoints on their own domain
+        fingerprint.features.append('headless')
+
+    return fingerprint
+
+
+def apply_meta_json(fingerprint: StoreFingerprint, meta: Dict[str, Any]) -> StoreFingerprint:
+    """Confirm a store through /meta.json, used when the homepage alone was inconclusive"""
+    if not isinstance(meta, dict) or not (meta.get('myshopify_domain') or meta.get('id')):
+        return fingerprint
+
+    fingerprint.is_shopify = True
+    fingerprint.signals.append('meta.json')
+    fingerprint.shop_id = fingerprint.shop_id or (str(meta['id']) if meta.get('id') else None)
+    fingerprint.myshopify_domain = fingerprint.myshopify_domain or meta.get('myshopify_domain')
+    fingerprint.currency = fingerprint.currency or meta.get('currency')
+    return fingerprint
@@ -0,0 +1,110 @@
+import json
+from typing import Optional, List, Dict, Any, Iterable
+
+# schema.org types that describe the store itself
+ORGANIZATION_TYPES = ('Organization', 'Corporation', 'LocalBusiness', 'Store', 'OnlineStore', 'Brand')
+
+
+def iter_json_ld(soup) -> Iterable[Dict[str, Any]]:
+    """Yield every JSON-LD object on the page, flattening @graph containers and lists"""
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                if '@graph' in item:
+                    stack.extend(item['@graph'] if isinstance(item['@graph'], list) else [item['@graph']])
+                yield item
+
+
+def _types(item: Dict[str, Any]) -> List[str]:
+    types = item.get('@type')
+    if isinstance(types, list):
+        return [str(t) for t in types]
+    return [str(types)] if types else []
+
+
+def _text(value: Any) -> Optional[str]:
+    """Return a stripped string value, or None for empty and non-string values"""
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+class StructuredData:
+    """JSON-LD blocks and meta tags of one page, parsed once and shared by every extraction stage"""
+
+    def __init__(self):
+        self.organizations: List[Dict[str, Any]] = []
+        self.websites: List[Dict[str, Any]] = []
+        self.products: List[Dict[str, Any]] = []
+        self.faq_pages: List[Dict[str, Any]] = []
+        # og:*, twitter:* and named meta tags such as description
+        self.meta: Dict[str, str] = {}
+        self.title: Optional[str] = None
+
+    @property
+    def organization(self) -> Dict[str, Any]:
+        return self.organizations[0] if self.organizations else {}
+
+    @property
+    def brand_name(self) -> Optional[str]:
+        """Organization name, then WebSite name, then og:site_name"""
+        for item in self.organizations + self.websites:
+            name = _text(item.get('name'))
+            if name:
+                return name
+        return _text(self.meta.get('og:site_name'))
+
+    @property
+    def description(self) -> Optional[str]:
+        return (
+            _text(self.organization.get('description'))
+            or _text(self.meta.get('description'))
+            or _text(self.meta.get('og:description'))
+        )
+
+    @property
+    def same_as(self) -> List[str]:
+        """Profile links the store declares for itself (social accounts)"""
+        links: List[str] = []
+        for item in self.organizations:
+            same_as = item.get('sameAs') or []
+            if isinstance(same_as, str):
+                same_as = [same_as]
+            links.extend(link.strip() for link in same_as if isinstance(link, str))
+        return links
+
+
+def extract_structured_data(soup) -> StructuredData:
+    """Parse JSON-LD Organization/WebSite/Product/FAQPage blocks and OpenGraph/meta tags in one pass"""
+    data = StructuredData()
+
+    for item in iter_json_ld(soup):
+        types = _types(item)
+        if any(t in ORGANIZATION_TYPES for t in types):
+            data.organizations.append(item)
+        elif 'WebSite' in types:
+            data.websites.append(item)
+        elif 'Product' in types or 'ProductGroup' in types:
+            data.products.append(item)
+        elif 'FAQPage' in types:
+            data.faq_pages.append(item)
+
+    for meta in soup.find_all('meta', content=True):
+        key = meta.get('property') or meta.get('name')
+        if key and key.lower() not in data.meta:
+            data.meta[key.lower()] = meta['content']
+
+    title = soup.find('title')
+    if title:
+        data.title = _text(title.get_text())
+
+    return data
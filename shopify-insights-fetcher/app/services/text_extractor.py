@@ -0,0 +1,93 @@
+import re
+from typing import TYPE_CHECKING, Optional, List, Iterable, Iterator, FrozenSet
+
+if TYPE_CHECKING:
+    from bs4.element import Tag
+
+# Containers holding the body of policy, page and article templates, most specific first
+MAIN_CONTENT_SELECTORS = (
+    '.shopify-policy__body',
+    'main .rte',
+    'article .rte',
+    'main article',
+    'article',
+    'main',
+    '[role="main"]',
+    '#MainContent',
+    '.rte',
+)
+
+# Subtrees that never contribute readable text; skipped instead of decomposed
+SKIP_TAGS = frozenset({
+    'script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form', 'button', 'select',
+    'nav', 'header', 'footer',
+})
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace into single spaces"""
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def iter_text(root: 'Tag', skip_tags: FrozenSet[str] = SKIP_TAGS) -> Iterator[str]:
+    """Yield the normalized visible strings under `root` in document order"""
+    from bs4.element import NavigableString, PreformattedString, Tag
+
+    stack = [iter(root.contents)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+        elif isinstance(node, Tag):
+            if node.name not in skip_tags:
+                stack.append(iter(node.contents))
+        elif isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+            text = normalize_text(node)
+            if text:
+                yield text
+
+
+def find_main_content(soup) -> Optional['Tag']:
+    """The element holding the page's main content, or None when no known container exists"""
+    for selector in MAIN_CONTENT_SELECTORS:
+        element = soup.select_one(selector)
+        if element is not None:
+            return element
+    return None
+
+
+def join_text(texts: Iterable[str], max_chars: int) -> str:
+    """Join strings with spaces into at most `max_chars` characters, consuming no more of `texts` than needed"""
+    parts: List[str] = []
+    length = 0
+    for text in texts:
+        parts.append(text)
+        length += len(text) + 1
+        # Stop walking the tree once the budget is covered
+        if length >= max_chars:
+            break
+    return ' '.join(parts)[:max_chars]
+
+
+def _collect(root: 'Tag', max_chars: int) -> str:
+    return join_text(iter_text(root), max_chars)
+
+
+def extract_main_text(soup, max_chars: int, min_chars: int = 0) -> Optional[str]:
+    """
+    Normalized text of the page's main content, at most `max_chars` long
+
+    Falls back to the whole body when the main container is missing or holds fewer than
+    `min_chars` characters; returns None when neither reaches `min_chars`.
+    """
+    container = find_main_content(soup)
+    text = _collect(container, max_chars) if container is not None else ''
+
+    if len(text) < min_chars:
+        body = soup.body or soup
+        if body is not container:
+            text = _collect(body, max_chars)
+
+    return text if text and len(text) >= min_chars else None
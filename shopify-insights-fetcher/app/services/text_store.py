@@ -0,0 +1,78 @@
+import hashlib
+from typing import Optional, Dict, Iterable
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.brand import TextBlob
+
+
+def text_hash(text: Optional[str]) -> Optional[str]:
+    """Content address of a text field; None for empty text"""
+    if not text:
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TextStore:
+    """Content-addressed, reference-counted storage for long text fields shared across stores"""
+
+    @staticmethod
+    def put(db: Session, text: Optional[str]) -> Optional[str]:
+        """Store text (or add a reference to an identical copy) and return its hash"""
+        digest = text_hash(text)
+        if digest is None:
+            return None
+
+        if TextStore._add_reference(db, digest):
+            return digest
+
+        try:
+            with db.begin_nested():
+                db.add(TextBlob(hash=digest, content=text, size=len(text), ref_count=1))
+        except IntegrityError:
+            # Another writer stored the same text first
+            TextStore._add_reference(db, digest)
+
+        return digest
+
+    @staticmethod
+    def _add_reference(db: Session, digest: str) -> bool:
+        updated = db.query(TextBlob).filter(TextBlob.hash == digest).update(
+            {TextBlob.ref_count: TextBlob.ref_count + 1}, synchronize_session=False
+        )
+        return updated > 0
+
+    @staticmethod
+    def release(db: Session, digest: Optional[str]) -> None:
+        """Drop one reference, deleting the text once nothing refers to it"""
+        if digest is None:
+            return
+
+        db.query(TextBlob).filter(TextBlob.hash == digest).update(
+            {TextBlob.ref_count: TextBlob.ref_count - 1}, synchronize_session=False
+        )
+        db.query(TextBlob).filter(TextBlob.hash == digest, TextBlob.ref_count <= 0).delete(synchronize_session=False)
+
+    @staticmethod
+    def replace(db: Session, old_digest: Optional[str], text: Optional[str]) -> Optional[str]:
+        """Point a field at new text, touching the store only when the content actually changed"""
+        digest = text_hash(text)
+        if digest == old_digest:
+            return digest
+
+        TextStore.put(db, text)
+        TextStore.release(db, old_digest)
+        return digest
+
+    @staticmethod
+    def get(db: Session, digest: Optional[str]) -> Optional[str]:
+        if digest is None:
+            return None
+        return db.query(TextBlob.content).filter(TextBlob.hash == digest).scalar()
+
+    @staticmethod
+    def get_many(db: Session, digests: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Resolve several hashes in one query"""
+        digests = {digest for digest in digests if digest}
+        if not digests:
+            return {}
+        return dict(db.query(TextBlob.hash, TextBlob.content).filter(TextBlob.hash.in_(digests)).all())
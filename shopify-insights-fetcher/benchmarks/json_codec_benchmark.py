@@ -0,0 +1,117 @@
+"""
+Compare JSON decoding of a /products.json payload and encoding of a BrandResponse
+for a synthetic 10k-product catalog.
+
+Usage:
+    python -m benchmarks.json_codec_benchmark [--products 10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List
+from fastapi.encoders import jsonable_encoder
+from app.core import json_codec
+from app.schemas.brand import BrandInsights, BrandResponse
+from app.services.fetching import iter_json_array_items
+from app.services.shopify_scraper import ShopifyScraper
+
+
+def make_products(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Deterministic products shaped like Shopify's /products.json entries"""
+    rng = random.Random(seed)
+    timestamp = "2024-01-01T00:00:00-05:00"
+    products = []
+
+    for index in range(count):
+        product_id = 7000000000 + index
+        products.append({
+            "id": product_id,
+            "title": f"Product {index}",
+            "handle": f"product-{index}",
+            "body_html": "<p>" + "Soft organic cotton, cut for an easy fit. " * 12 + "</p>",
+            "published_at": timestamp,
+            "created_at": timestamp,
+            "updated_at": timestamp,
+            "vendor": f"Vendor {index % 40}",
+            "product_type": f"Type {index % 15}",
+            "tags": "new,cotton,summer",
+            "variants": [
+                {
+                    "id": product_id * 10 + position,
+                    "title": size,
+                    "option1": size,
+                    "option2": None,
+                    "option3": None,
+                    "sku": f"SKU-{index}-{size}",
+                    "requires_shipping": True,
+                    "taxable": True,
+                    "available": rng.random() > 0.2,
+                    "price": f"{rng.uniform(5, 250):.2f}",
+                    "compare_at_price": f"{rng.uniform(250, 300):.2f}" if rng.random() > 0.7 else None,
+                    "grams": 250,
+                    "position": position + 1,
+                    "product_id": product_id,
+                    "created_at": timestamp,
+                    "updated_at": timestamp,
+                }
+                for position, size in enumerate(("S", "M", "L", "XL"))
+            ],
+            "images": [
+                {
+                    "id": product_id * 100 + position,
+                    "position": position + 1,
+                    "product_id": product_id,
+                    "src": f"https://cdn.shopify.com/s/files/1/0000/0001/products/{index}-{position}.jpg",
+                    "width": 1200,
+                    "height": 1200,
+                }
+                for position in range(3)
+            ],
+            "options": [{"name": "Size", "position": 1, "values": ["S", "M", "L", "XL"]}],
+        })
+
+    return products
+
+
+def measure(label: str, func: Callable[[], Any], repeat: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f"  {label:<48} {elapsed:9.1f} ms")
+    return elapsed
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    raw = make_products(args.products)
+    payload = json.dumps({"products": raw}).encode()
+    chunks = [payload[offset:offset + 64 * 1024] for offset in range(0, len(payload), 64 * 1024)]
+    print(f"JSON backend: {json_codec.JSON_BACKEND}; {args.products} products, {len(payload) / 1e6:.1f} MB payload\n")
+
+    print("Decode /products.json")
+    measure("json.loads", lambda: json.loads(payload), args.repeat)
+    measure("json_codec.loads", lambda: json_codec.loads(payload), args.repeat)
+    measure("iter_json_array_items (streamed, 64 KB chunks)",
+            lambda: list(iter_json_array_items(chunks, "products", 2 * 1024 * 1024)), args.repeat)
+
+    insights = BrandInsights(website_url="https://bench.example", brand_name="Bench",
+                             product_catalog=[ShopifyScraper._parse_product(product) for product in raw])
+    response = BrandResponse(success=True, data=insights, status_code=200)
+
+    print("\nEncode BrandResponse")
+    baseline = measure("jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(response)).encode(), args.repeat)
+    measure("response_model path (model_dump + json.dumps)",
+            lambda: json.dumps(response.model_dump(mode="json")).encode(), args.repeat)
+    fast = measure("json_codec.dumps", lambda: json_codec.dumps(response), args.repeat)
+    print(f"\njson_codec.dumps is {baseline / fast:.1f}x faster than jsonable_encoder + json.dumps")
+
+
+if __name__ == "__main__":
+    main()
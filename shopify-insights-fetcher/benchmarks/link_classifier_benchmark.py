@@ -0,0 +1,114 @@
+"""
+Compare the previous per-keyword anchor loops with the compiled link classifier on a
+synthetic homepage with thousands of links.
+
+Usage:
+    python -m benchmarks.link_classifier_benchmark [--links 5000] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from app.services.link_classifier import classify_links
+
+BASE_URL = "https://bench.example"
+
+SOCIAL_LINKS = [
+    "https://www.facebook.com/sharer/sharer.php?u=https%3A%2F%2Fbench.example",
+    "https://twitter.com/intent/tweet?url=https%3A%2F%2Fbench.example",
+    "https://www.instagram.com/benchbrand/",
+    "https://www.facebook.com/benchbrand",
+    "https://x.com/benchbrand",
+    "https://www.tiktok.com/@benchbrand",
+    "https://www.youtube.com/@benchbrand",
+    "https://www.linkedin.com/company/benchbrand/",
+]
+FOOTER_LINKS = [
+    ("/pages/track-your-order", "Track order"),
+    ("/pages/contact", "Contact us"),
+    ("/blogs/news", "Journal"),
+    ("/pages/about-us", "Our story"),
+    ("/policies/shipping-policy", "Shipping"),
+]
+
+
+def make_homepage(links: int, seed: int = 42) -> str:
+    """Mega-menu and product grid links first, footer and social links at the end like most themes"""
+    rng = random.Random(seed)
+    anchors = []
+    for index in range(links):
+        if rng.random() < 0.7:
+            anchors.append(f'<a href="/products/product-{index}"><span>Product {index}</span></a>')
+        else:
+            anchors.append(f'<a href="/collections/collection-{index % 200}">Collection {index % 200}</a>')
+    anchors += [f'<a href="{href}">{text}</a>' for href, text in FOOTER_LINKS]
+    anchors += [f'<a href="{href}"><svg></svg></a>' for href in SOCIAL_LINKS]
+    return "<html><body><main>" + "\n".join(anchors) + "</main></body></html>"
+
+
+def legacy_classify(soup) -> Dict[str, Any]:
+    """The keyword chains and social re-scan the scraper used before the classifier"""
+    important: Dict[str, str] = {}
+    keyword_groups = [
+        ("order_tracking", ["track", "order", "tracking"]),
+        ("contact_us", ["contact", "support"]),
+        ("blogs", ["blog", "news", "article"]),
+        ("about_us", ["about", "story"]),
+        ("shipping_info", ["shipping", "delivery"]),
+    ]
+    for link in soup.find_all("a", href=True):
+        href = link.get("href", "").lower()
+        text = link.get_text().lower().strip()
+        full_url = urljoin(BASE_URL, link.get("href"))
+        for field, keywords in keyword_groups:
+            if any(keyword in href or keyword in text for keyword in keywords):
+                important.setdefault(field, full_url)
+                break
+
+    social: Dict[str, str] = {}
+    platforms = [("instagram", "instagram.com"), ("facebook", "facebook.com"), ("twitter", "twitter.com"),
+                 ("twitter", "x.com"), ("tiktok", "tiktok.com"), ("youtube", "youtube.com"), ("linkedin", "linkedin.com")]
+    for link in soup.find_all("a", href=re.compile(r"(instagram|facebook|twitter|tiktok|youtube|linkedin)")):
+        href = link.get("href", "")
+        for platform, domain in platforms:
+            if domain in href:
+                social.setdefault(platform, href)
+                break
+    return {"important": important, "social": social}
+
+
+def measure(label: str, func: Callable[[], Any], repeat: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f"  {label:<40} {elapsed:9.1f} ms")
+    return elapsed
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--links", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    soup = BeautifulSoup(make_homepage(args.links), "html.parser")
+    print(f"Homepage with {args.links + len(FOOTER_LINKS) + len(SOCIAL_LINKS)} links (DOM parsed once, not timed)\n")
+
+    legacy = measure("keyword chains + social re-scan", lambda: legacy_classify(soup), args.repeat)
+    compiled = measure("classify_links", lambda: classify_links(soup, BASE_URL), args.repeat)
+    print(f"\nclassify_links is {legacy / compiled:.1f}x faster")
+
+    links = classify_links(soup, BASE_URL)
+    old = legacy_classify(soup)
+    print("\nSocial profiles")
+    for platform, profile in links.social.items():
+        print(f"  {platform:<10} handle={profile.handle:<12} (previously {old['social'].get(platform)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure the cold-start import cost of the API process with `python -X importtime`.
+
+Each run imports the module in a fresh interpreter; the report lists the median wall time,
+the slowest top-level packages and whether any of the lazily imported dependencies leaked
+into startup.
+
+Usage:
+    python -m benchmarks.startup_benchmark [--module app.main] [--runs 5] [--top 15] [--output FILE]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Dependencies that must only be imported on first use, not when the app starts
+LAZY_MODULES = ("requests", "urllib3", "bs4", "pandas", "numpy", "pyarrow", "httpx")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| *(\S+)")
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(elapsed)\n"
+    "print(','.join(sorted(name for name in {lazy!r} if name in sys.modules)))\n"
+)
+
+
+def run_once(module: str) -> Tuple[float, List[Tuple[str, int]], List[str]]:
+    """Import `module` in a new interpreter; returns (seconds, [(name, self us)], lazy modules loaded)"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=root, capture_output=True, text=True, check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append((match.group(2), int(match.group(1))))
+
+    elapsed, loaded = result.stdout.splitlines()[-2:]
+    return float(elapsed), imports, [name for name in loaded.split(",") if name]
+
+
+def package_costs(imports: List[Tuple[str, int]]) -> Dict[str, int]:
+    """Microseconds spent importing the modules of each top-level package, excluding other packages"""
+    costs: Dict[str, int] = {}
+    for name, self_time in imports:
+        package = name.split(".")[0]
+        costs[package] = costs.get(package, 0) + self_time
+    return costs
+
+
+def report(module: str, runs: int, top: int) -> str:
+    timings = []
+    imports: List[Tuple[str, int]] = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        elapsed, imports, loaded = run_once(module)
+        timings.append(elapsed)
+
+    costs = sorted(package_costs(imports).items(), key=lambda item: item[1], reverse=True)[:top]
+    lines = [
+        f"Cold import of {module} (Python {sys.version.split()[0]}, {runs} runs)",
+        f"  median {statistics.median(timings) * 1000:.0f} ms, min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms",
+        "",
+        "Slowest packages (own import time, last run)",
+    ]
+    lines += [f"  {package:<32} {cost / 1000:8.1f} ms" for package, cost in costs]
+    lines += ["", f"Lazy dependencies imported at startup: {', '.join(loaded) or 'none'}"]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    text = report(args.module, args.runs, args.top)
+    print(text, end="")
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import json
+import pytest
+from app.services.fetching import iter_json_array_items
+
+DOCUMENTS = [
+    '{"products": [123456789012, 0.0001, -5, 1.5E+3, 2e10, true, false, null, "12", "]", {"products": [1]}]}',
+    '{"count": 12345, "meta": {"products": [0]}, "ratio": 0.25, "products": [{"id": 1, "price": "10.00"}, [1, 2], 7]}',
+    '{ "products" : [ {"title": "Caf\\u00e9 \\"noir\\"", "tags": ["été", "日本"]} , 42 ] , "after": 1.5 }',
+    '{"products": []}',
+]
+
+
+def split_at(document: bytes, offset: int):
+    return [document[:offset], document[offset:]]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_elements_survive_a_split_at_every_byte(document):
+    expected = json.loads(document)["products"]
+    encoded = document.encode()
+
+    for offset in range(len(encoded) + 1):
+        assert list(iter_json_array_items(split_at(encoded, offset), "products", 1024)) == expected, offset
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_elements_survive_single_byte_chunks(document):
+    encoded = document.encode()
+    chunks = [encoded[i:i + 1] for i in range(len(encoded))]
+
+    assert list(iter_json_array_items(chunks, "products", 1024)) == json.loads(document)["products"]
+
+
+def test_missing_array_yields_nothing():
+    assert list(iter_json_array_items([b'{"other": [1, 2]}'], "products", 1024)) == []
+    assert list(iter_json_array_items([b'[1, 2]'], "products", 1024)) == []
+
+
+def test_oversized_element_is_rejected():
+    with pytest.raises(ValueError):
+        list(iter_json_array_items([b'{"products": ["' + b'x' * 64, b'x' * 64 + b'"]}'], "products", 32))
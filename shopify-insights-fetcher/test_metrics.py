@@ -0,0 +1,17 @@
+from app.core.config import settings
+from app.core.metrics import TransferMetrics
+
+
+def test_only_recently_fetched_hosts_are_kept_but_totals_cover_all(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSFER_METRICS_MAX_HOSTS", 2)
+    metrics = TransferMetrics()
+
+    metrics.record("a.test", "gzip", 100, 400)
+    metrics.record("b.test", "identity", 50, 50)
+    metrics.record("a.test", "gzip", 100, 400)
+    metrics.record("c.test", "br", 10, 100, rejected=True)
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot["hosts"]) == {"a.test", "c.test"}
+    assert snapshot["hosts"]["a.test"]["requests"] == 2
+    assert snapshot["total"] == {"requests": 4, "wire_bytes": 260, "decoded_bytes": 950, "compression_ratio": 3.65}
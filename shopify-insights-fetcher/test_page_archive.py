@@ -0,0 +1,70 @@
+import asyncio
+import io
+import json
+import requests
+from requests.structures import CaseInsensitiveDict
+from app.cli import replay_archive
+from app.services.page_archive import PageArchive
+from app.services.shopify_scraper import ShopifyScraper
+
+HOMEPAGE = b"""<html><head><title>Memy | Home</title>
+<script src="https://cdn.shopify.com/s/files/theme.js"></script></head>
+<body><script>window.Shopify = {shop: "memy.myshopify.com"};</script></body></html>"""
+
+PRODUCTS = json.dumps({"products": [{
+    "id": 1, "title": "Shirt", "handle": "shirt",
+    "variants": [{"id": 11, "price": "10.00", "available": True}]
+}]}).encode()
+
+
+class FakeSession:
+    """Serves the homepage and one page of products; every other request is a 404"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, stream=False, params=None, **kwargs):
+        self.requests.append(url)
+        response = requests.Response()
+        response.url = url
+        response.status_code, body, content_type = 404, b"Not found", "text/html"
+
+        if url == "https://memy.co.in/":
+            response.status_code, body = 200, HOMEPAGE
+        elif url == "https://memy.co.in/products.json":
+            first_page = not params or str(params.get("page", 1)) == "1"
+            response.status_code, content_type = 200, "application/json"
+            body = PRODUCTS if first_page else b'{"products": []}'
+
+        response.headers = CaseInsensitiveDict({"Content-Type": content_type, "Content-Length": str(len(body))})
+        response.raw = io.BytesIO(body)
+        return response
+
+
+def test_recorded_scrape_replays_with_no_urls_given(tmp_path):
+    archive = PageArchive(str(tmp_path / "archive"))
+    session = FakeSession()
+    recorded = asyncio.run(ShopifyScraper(session=session, archive=archive).scrape_brand_insights("memy.co.in"))
+    assert [product.handle for product in recorded.product_catalog] == ["shirt"]
+
+    assert archive.stores() == ["https://memy.co.in/"]
+
+    output = tmp_path / "replayed.ndjson"
+    status = replay_archive.main(["--archive", str(tmp_path / "archive"), "--output", "ndjson",
+                                  "--path", str(output), "--processes", "1"])
+
+    assert status == 0
+    [replayed] = [json.loads(line) for line in output.read_text().splitlines()]
+    assert replayed["website_url"] == "https://memy.co.in/"
+    assert [product["handle"] for product in replayed["product_catalog"]] == ["shirt"]
+    assert replayed["brand_name"] == recorded.brand_name
+
+
+def test_archives_recorded_without_a_trailing_slash_still_replay(tmp_path):
+    from app.services.fetching import FetchedResponse
+
+    archive = PageArchive(str(tmp_path))
+    archive.record("https://memy.co.in", None, FetchedResponse("https://memy.co.in", 200, {}, HOMEPAGE))
+
+    assert archive.stores() == ["https://memy.co.in/"]
+    assert PageArchive(str(tmp_path)).replay("https://memy.co.in/").content == HOMEPAGE
@@ -0,0 +1,58 @@
+import asyncio
+import io
+import requests
+from requests.structures import CaseInsensitiveDict
+from app.services.probe_cache import ProbePlan
+from app.services.resilience import Deadline
+from app.services.shopify_scraper import ShopifyScraper
+
+PATHS = ['/pages/faq', '/pages/faqs', '/faq', '/faqs']
+
+
+class FaqSession:
+    """Serves the FAQ at one path; every other page is a 404"""
+
+    def __init__(self, faq_path: str):
+        self.faq_url = 'https://probe.test' + faq_path
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        found = url == self.faq_url
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200 if found else 404
+        response.headers = CaseInsensitiveDict({"Content-Type": "text/html"})
+        response.raw = io.BytesIO(b"<html><body>FAQ</body></html>" if found else b"Not found")
+        return response
+
+
+def find_faq_page(probes: ProbePlan, faq_path: str):
+    session = FaqSession(faq_path)
+    scraper = ShopifyScraper(session=session)
+    scraper._deadline = Deadline(30)
+    scraper._probes = probes
+
+    async def find():
+        page = await scraper._find_page('faqs', 'https://probe.test/', PATHS, lambda page: True, prefetch=True)
+        await scraper._settle_prefetches()
+        return page
+
+    return asyncio.run(find()), session.requested
+
+
+def test_proven_path_is_fetched_alone():
+    page, requested = find_faq_page(ProbePlan('probe.test', stats={('faqs', '/faqs'): (10, 0)}), '/faqs')
+
+    assert page.url == 'https://probe.test/faqs'
+    assert requested == ['https://probe.test/faqs']
+
+
+def test_unproven_candidates_are_prefetched_and_their_misses_recorded():
+    probes = ProbePlan('probe.test')
+    page, requested = find_faq_page(probes, '/pages/faq')
+
+    assert page.url == 'https://probe.test/pages/faq'
+    assert sorted(requested) == sorted('https://probe.test' + path for path in PATHS)
+    # The pages after the accepted one were never read; their misses still reach the plan
+    assert probes.missing == {'/pages/faqs', '/faq', '/faqs'}
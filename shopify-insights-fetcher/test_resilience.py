@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+import requests
+from app.core.config import settings
+from app.services.resilience import CircuitBreakerRegistry, Deadline, circuit_breakers
+from app.services.shopify_scraper import ShopifyScraper
+
+
+class TimeoutSession:
+    def get(self, url, **kwargs):
+        raise requests.ReadTimeout(f"Read timed out ({url})")
+
+
+def fetch_with_deadline(url: str, deadline):
+    scraper = ShopifyScraper(session=TimeoutSession())
+    scraper._deadline = deadline
+    with pytest.raises(requests.ReadTimeout):
+        asyncio.run(scraper._fetch(url))
+
+
+def test_timeouts_clipped_by_the_deadline_do_not_count_against_the_host():
+    fetch_with_deadline("https://clipped.test/", Deadline(1))
+
+    assert circuit_breakers.get("clipped.test").failures == 0
+
+
+def test_timeouts_within_the_configured_limit_count_against_the_host():
+    fetch_with_deadline("https://slow.test/", None)
+    fetch_with_deadline("https://slow.test/", Deadline(settings.READ_TIMEOUT * 10))
+
+    assert circuit_breakers.get("slow.test").failures == 2
+
+
+def test_registry_keeps_only_the_most_recently_used_hosts(monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_MAX_HOSTS", 2)
+    registry = CircuitBreakerRegistry()
+
+    first = registry.get("a.test")
+    registry.get("b.test")
+    assert registry.get("a.test") is first
+    registry.get("c.test")
+
+    assert set(registry.snapshot()) == {"a.test", "c.test"}
@@ -0,0 +1,17 @@
+import asyncio
+from app.core.config import settings
+from app.schemas.brand import BrandInsights
+from app.services.shared_state import MemorySharedState, ScrapeLease
+
+
+def test_partial_results_are_cached_only_briefly(monkeypatch):
+    monkeypatch.setattr(settings, "PARTIAL_RESULT_CACHE_TTL", 0)
+    shared_state = MemorySharedState()
+
+    partial = BrandInsights(website_url="https://partial.test/", scraping_status="partial")
+    asyncio.run(ScrapeLease(shared_state, "insights:https://partial.test/").store(partial))
+    completed = BrandInsights(website_url="https://completed.test/")
+    asyncio.run(ScrapeLease(shared_state, "insights:https://completed.test/").store(completed))
+
+    assert shared_state.get("insights:https://partial.test/") is None
+    assert BrandInsights.parse_raw(shared_state.get("insights:https://completed.test/")) == completed
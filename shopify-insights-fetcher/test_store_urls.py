@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.urls import normalize_url
+from app.main import app
+from app.models.brand import Base
+from app.schemas.brand import BrandInsights, BrandRequest, CollectionInfo, ProductInfo
+from app.services.brand_service import BrandService
+from app.services.catalog_export import iter_db_catalogs, stream_export
+from app.services.database import get_db
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    # Only database-backed endpoints are called, so the app's lifespan resources are not needed
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def api_url(website_url: str) -> str:
+    """The URL /fetch-insights receives for a store, as pydantic spells it"""
+    return str(BrandRequest(website_url=website_url).website_url)
+
+
+def test_normalize_url_matches_the_api_spelling():
+    for spelling in ("memy.co.in", "https://memy.co.in", "https://memy.co.in/", "HTTPS://Memy.co.in", " memy.co.in "):
+        assert normalize_url(spelling) == api_url("https://memy.co.in") == "https://memy.co.in/"
+    assert normalize_url("https://memy.co.in/collections/sale") == "https://memy.co.in/collections/sale"
+
+
+def test_stores_saved_under_any_spelling_share_one_row(db):
+    BrandService.save_insights(db, BrandInsights(website_url=api_url("https://memy.co.in"), brand_name="API"))
+    BrandService.save_insights(db, BrandInsights(website_url="memy.co.in", brand_name="CLI"))
+
+    assert len(BrandService.get_all_brands(db)) == 1
+    assert BrandService.get_brand_by_url(db, "https://memy.co.in").brand_name == "CLI"
+
+
+def test_db_export_finds_stores_scraped_through_the_api(db):
+    product = ProductInfo(id="1", title="Shirt", handle="shirt", price="10.00")
+    BrandService.save_insights(db, BrandInsights(website_url=api_url("https://memy.co.in"), product_catalog=[product]))
+
+    async def export():
+        return b"".join([chunk async for chunk in stream_export(iter_db_catalogs(db, ["https://memy.co.in"]), "csv", "products")])
+
+    rows = asyncio.run(export()).decode().strip().splitlines()
+    assert len(rows) == 2
+    assert "Shirt" in rows[1]
+
+
+def test_stored_insights_are_found_by_any_spelling(db, client):
+    BrandService.save_insights(db, BrandInsights(website_url=api_url("https://memy.co.in"), privacy_policy="Policy text"))
+
+    for spelling in ("memy.co.in", "https://memy.co.in", "https://memy.co.in/"):
+        response = client.get("/api/v1/shopify/insights", params={"website_url": spelling})
+        assert response.status_code == 200
+        assert response.json()["privacy_policy"] == "Policy text"
+
+
+def test_stored_collections_are_found_by_any_spelling(db, client):
+    product = ProductInfo(id="1", title="Shirt", handle="shirt")
+    collection = CollectionInfo(id="9", handle="sale", title="Sale", product_ids=["1"])
+    BrandService.save_insights(db, BrandInsights(
+        website_url=api_url("https://memy.co.in"), product_catalog=[product], collections=[collection]
+    ))
+
+    for spelling in ("memy.co.in", "https://memy.co.in"):
+        collections = client.get("/api/v1/shopify/collections", params={"website_url": spelling})
+        assert [c["handle"] for c in collections.json()] == ["sale"]
+
+        products = client.get("/api/v1/shopify/collections/sale/products", params={"website_url": spelling})
+        assert [p["title"] for p in products.json()] == ["Shirt"]
+
+
+def test_watched_stores_are_unwatched_by_any_spelling(client):
+    assert client.post("/api/v1/shopify/watch", json={"website_url": "https://memy.co.in"}).status_code == 200
+    assert client.post("/api/v1/shopify/watch", json={"website_url": "https://MEMY.co.in/"}).status_code == 200
+
+    schedules = client.get("/api/v1/shopify/schedule", params={"website_url": "memy.co.in"}).json()
+    assert sorted(schedule["section"] for schedule in schedules) == ["catalog", "content"]
+
+    assert client.delete("/api/v1/shopify/watch", params={"website_url": "memy.co.in"}).status_code == 200
+    assert client.get("/api/v1/shopify/schedule").json() == []
+
+
+def test_analytics_finds_stores_by_any_spelling(db, client):
+    pytest.importorskip("pandas")
+    product = ProductInfo(id="1", title="Shirt", handle="shirt", price="10.00")
+    BrandService.save_insights(db, BrandInsights(website_url=api_url("https://memy.co.in"), product_catalog=[product]))
+
+    response = client.get("/api/v1/shopify/analytics", params={"website_url": "memy.co.in"})
+
+    assert response.status_code == 200
+    assert [store["website_url"] for store in response.json()["stores"]] == ["https://memy.co.in/"]
+
+
+def test_cli_urls_and_checkpoints_use_the_api_spelling(tmp_path):
+    from app.cli.bulk_scrape import Checkpoint
+    from app.cli.common import read_urls
+
+    stores = tmp_path / "stores.txt"
+    stores.write_text("# stores\nmemy.co.in\nhttps://memy.co.in/\n\nhairoriginals.com\n")
+    assert read_urls(["https://Memy.co.in"], str(stores)) == [api_url("https://memy.co.in"), api_url("https://hairoriginals.com")]
+
+    # Checkpoints written before URLs were canonical still resume
+    checkpoint = tmp_path / "bulk_scrape.checkpoint"
+    checkpoint.write_text("ok\thttps://memy.co.in\n")
+    assert api_url("https://memy.co.in") in Checkpoint(str(checkpoint)).finished